@@ -0,0 +1,71 @@
+"""
+Compara la comparación texto/transcripción de antes (SequenceMatcher sobre
+caracteres) con WordAligner (diff de Myers sobre palabras internadas).
+
+Genera textos de distinto largo y una "lectura" con errores típicos
+(sustituciones, omisiones, repeticiones) a la tasa indicada, más un caso en
+que la transcripción no corresponde al texto.
+
+Uso: python -m benchmarks.bench_alignment [--words 100 1000 5000] [--error-rate 0.05] [--max-edits 1000]
+"""
+import time
+import random
+import argparse
+from difflib import SequenceMatcher
+from services.WordAligner import WordAligner
+
+VOCABULARY = (
+    "el la los las un una de del en y que a con por para su sus es era fue "
+    "perro gato niña niño casa árbol sol luna agua río campo escuela libro "
+    "mamá papá abuela amigo juega corre salta come lee mira canta duerme "
+    "grande pequeño rojo azul verde feliz triste rápido lento muy siempre"
+).split()
+
+
+def make_reading(words: int, error_rate: float, rng: random.Random) -> tuple[list[str], list[str]]:
+    expected = [rng.choice(VOCABULARY) for _ in range(words)]
+    read = []
+    for word in expected:
+        roll = rng.random()
+        if roll < error_rate / 3:
+            read.append(rng.choice(VOCABULARY))      # sustitución
+        elif roll < 2 * error_rate / 3:
+            continue                                  # omisión
+        elif roll < error_rate:
+            read.extend([word, word])                 # repetición (inserción)
+        else:
+            read.append(word)
+    return expected, read
+
+
+def timed(fn) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--words", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--max-edits", type=int, default=1000, help="como ALIGN_MAX_EDITS")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    aligner = WordAligner()
+    print(f"{'caso':<22}{'difflib (s)':>12}{'ratio':>8}{'palabras (s)':>14}{'ratio':>8}{'speedup':>9}  diferencias")
+    for words in args.words:
+        expected, read = make_reading(words, args.error_rate, rng)
+        cases = {
+            f"{words} palabras": (expected, read),
+            f"{words} otro texto": (expected, make_reading(words, 0, rng)[0]),
+        }
+        for name, (text, transcript) in cases.items():
+            t_difflib, ratio = timed(lambda: SequenceMatcher(None, " ".join(transcript), " ".join(text)).ratio())
+            t_words, alignment = timed(lambda: aligner.align(text, transcript, args.max_edits))
+            print(f"{name:<22}{t_difflib:>12.3f}{ratio:>8.3f}{t_words:>14.3f}{alignment.similaridad:>8.3f}"
+                  f"{t_difflib / t_words:>8.1f}x  {len(alignment.diferencias) if alignment.completa else '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Benchmark end-to-end de la app FastAPI contra proveedores simulados.
+
+Levanta la app en proceso (lifespan incluido), reemplaza las estrategias del
+factory por FakeProviderStrategy y dispara requests concurrentes a
+/evaluar-lectura con WAVs sintéticos de distintas duraciones y frecuencias
+de muestreo. Reporta requests/s, latencias p50/p95/p99, tiempo de CPU por
+etapa local y RSS pico, y guarda todo en un JSON comparable entre commits.
+La CPU y la memoria de la carga incluyen los workers del pool DSP, que
+corren en procesos aparte (se leen de /proc, así que solo en Linux).
+
+Uso: python -m benchmarks.bench_app --requests 200 --concurrency 16 --latency-scale 0.05 --out bench.json
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import platform
+import resource
+import subprocess
+import httpx
+from services.DecodedAudio import DecodedAudio
+from services.AudioPipeline import AudioPipeline
+from services.strategies import EvaluationStrategyFactory, EvaluationModel
+from benchmarks.fake_provider import FakeProviderStrategy, PROFILES
+from benchmarks.fixtures import make_fixture
+
+TEXT = "El búho vivía en un árbol muy alto del bosque, y cada noche miraba las estrellas."
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def build_fixtures(durations: list[int], sample_rates: list[int]) -> list[tuple[str, bytes]]:
+    fixtures = []
+    for i, seconds in enumerate(durations):
+        for j, sample_rate in enumerate(sample_rates):
+            name = f"{seconds}s-{sample_rate}Hz-stereo"
+            fixtures.append((name, make_fixture(seconds, sample_rate, 2, 8.0, seed=i * 100 + j)))
+    return fixtures
+
+
+def profile_stages(fixtures: list[tuple[str, bytes]], repeat: int) -> dict:
+    """Tiempo de CPU (ms) de cada etapa local, promediado sobre los fixtures."""
+    pipeline = AudioPipeline()
+    totals: dict[str, float] = {}
+    runs = 0
+    for _ in range(repeat):
+        for _, data in fixtures:
+            stages = {}
+            start = time.process_time()
+            audio = DecodedAudio(data)
+            audio.samples
+            stages["decode"] = time.process_time() - start
+
+            start = time.process_time()
+            silent_ranges = pipeline.wpm.silent_ranges(audio)
+            pipeline.wpm.calculate(audio, TEXT, silent_ranges=silent_ranges)
+            stages["silence_wpm"] = time.process_time() - start
+
+            start = time.process_time()
+            trimmed, _ = pipeline.trim.trim(audio, silent_ranges)
+            stages["trim"] = time.process_time() - start
+
+            start = time.process_time()
+            pipeline.preprocess.prepare(trimmed)
+            stages["preprocess"] = time.process_time() - start
+
+            start = time.process_time()
+            audio.fingerprint
+            stages["fingerprint"] = time.process_time() - start
+
+            for stage, seconds in stages.items():
+                totals[stage] = totals.get(stage, 0.0) + seconds
+            runs += 1
+    return {stage: round(1000 * seconds / runs, 3) for stage, seconds in totals.items()}
+
+
+def worker_usage(pids: list[int]) -> tuple[float, float]:
+    """CPU (s) y suma de los RSS pico (MB) de los procesos dados, leídos de /proc."""
+    ticks = os.sysconf("SC_CLK_TCK")
+    cpu, peak_kb = 0.0, 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            cpu += (int(fields[11]) + int(fields[12])) / ticks  # utime y stime
+            with open(f"/proc/{pid}/status") as f:
+                peak_kb += next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+        except (OSError, StopIteration):
+            continue
+    return cpu, peak_kb / 1024
+
+
+async def run_load(args, fixtures: list[tuple[str, bytes]]) -> dict:
+    import main
+
+    for model in PROFILES:
+        EvaluationStrategyFactory.register(
+            model, FakeProviderStrategy(model, latency_scale=args.latency_scale, error_rate=args.error_rate)
+        )
+    # El modo auto se arma sobre las estrategias simuladas ya registradas.
+    EvaluationStrategyFactory._instances.pop(EvaluationModel.AUTO, None)
+
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait(i)
+
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+            async def worker():
+                while not queue.empty():
+                    i = queue.get_nowait()
+                    name, data = fixtures[i % len(fixtures)]
+                    # Texto distinto por request para no medir aciertos de cache.
+                    text = TEXT if args.allow_cache else f"{TEXT} ({i})"
+                    start = time.perf_counter()
+                    response = await client.post(
+                        "/evaluar-lectura",
+                        data={"text": text, "model": args.model},
+                        files={"audio": (f"{name}.wav", data, "audio/wav")},
+                    )
+                    latencies.append(time.perf_counter() - start)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+            dsp = main.evaluation_service.dsp
+            workers_cpu_start, _ = worker_usage(dsp.worker_pids())
+            cpu_start = time.process_time()
+            wall_start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            # Si un worker se reinició, su CPU previa se pierde: es una cota inferior.
+            workers_cpu, workers_rss = worker_usage(dsp.worker_pids())
+            workers_cpu = max(0.0, workers_cpu - workers_cpu_start)
+
+    return {
+        "requests": args.requests,
+        "segundos": round(wall, 3),
+        "requests_por_segundo": round(args.requests / wall, 3),
+        "latencia_s": {
+            "p50": round(percentile(latencies, 50), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "p99": round(percentile(latencies, 99), 4),
+            "max": round(max(latencies), 4),
+        },
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+        "cpu_ms_por_request": round(1000 * (cpu + workers_cpu) / args.requests, 3),
+        "cpu_ms_por_request_api": round(1000 * cpu / args.requests, 3),
+        "cpu_ms_por_request_workers": round(1000 * workers_cpu / args.requests, 3),
+        "rss_pico_workers_mb": round(workers_rss, 1),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="gemini-flash", choices=[*PROFILES, "auto"])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-scale", type=float, default=0.05,
+                        help="factor sobre la latencia emulada (1 = latencia real)")
+    parser.add_argument("--error-rate", type=float, default=None,
+                        help="tasa de errores de los proveedores (por defecto la del perfil)")
+    parser.add_argument("--durations", type=int, nargs="+", default=[30, 90, 180])
+    parser.add_argument("--sample-rates", type=int, nargs="+", default=[16000, 44100, 48000])
+    parser.add_argument("--stage-repeat", type=int, default=2)
+    parser.add_argument("--allow-cache", action="store_true")
+    parser.add_argument("--out", default="bench_output.json")
+    args = parser.parse_args()
+
+    fixtures = build_fixtures(args.durations, args.sample_rates)
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "fixtures": [name for name, _ in fixtures],
+        "etapas_cpu_ms": profile_stages(fixtures, args.stage_repeat),
+        "carga": asyncio.run(run_load(args, fixtures)),
+        # ru_maxrss está en KB en Linux; solo el proceso de la API.
+        "rss_pico_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Compara la reducción de ruido de antes (una sola llamada a
+noisereduce.reduce_noise sobre la señal completa, exactamente como la hacía
+NoiseReduceService: no estacionaria, con y_noise) con la versión por bloques.
+
+Para cada duración mide el tiempo y el pico de memoria (tracemalloc) de:
+- one-shot: nr.reduce_noise(y=..., sr=..., y_noise=y[:sr]) sobre todo el audio,
+- bloques: NoiseReduceService.stream consumiendo los bloques a medida que
+  salen (p. ej. para codificarlos o enviarlos),
+- reducir_ruido: la versión por bloques que arma el audio completo,
+- bloques de --small-block muestras, para ver cuánto cambia el resultado.
+
+La columna "dif." es el RMS de la diferencia con one-shot relativo al RMS
+de one-shot ("0" = idéntico muestra a muestra).
+El audio ya decodificado no cuenta en el pico: se decodifica antes de medir.
+
+Uso: python -m benchmarks.bench_noise_reduce [--seconds 30 120 300] [--small-block 80000]
+"""
+import time
+import argparse
+import tracemalloc
+import numpy as np
+from services.DecodedAudio import DecodedAudio
+from services.NoiseReduceService import NoiseReduceService
+from benchmarks.fixtures import make_fixture
+
+
+def measure(fn) -> tuple[float, float, object]:
+    """Retorna (segundos, pico de memoria en MB, resultado) de fn()."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, result
+
+
+def one_shot(audio: DecodedAudio) -> np.ndarray:
+    import noisereduce as nr
+
+    y, sr = audio.as_float(), audio.sample_rate
+    return nr.reduce_noise(y=y, sr=sr, y_noise=y[:sr])
+
+
+def difference(result: np.ndarray, reference: np.ndarray) -> str:
+    if np.array_equal(result, reference):
+        return "0"
+    return f"{np.sqrt(np.mean((result - reference) ** 2)) / np.sqrt(np.mean(reference ** 2)):.1%}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=int, nargs="+", default=[30, 120, 300])
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--small-block", type=int, default=80000, help="muestras por bloque del último camino")
+    args = parser.parse_args()
+
+    import noisereduce  # noqa: F401  (la importación no cuenta en la primera medición)
+
+    service = NoiseReduceService()
+    print(f"{'audio':<10}{'PCM (MB)':>10}  {'camino':<16}{'tiempo (s)':>12}{'pico (MB)':>12}{'dif.':>9}")
+    for seconds in args.seconds:
+        audio = DecodedAudio(make_fixture(seconds, args.sample_rate, 1, 300, seed=seconds))
+        audio.samples  # decodificar fuera de la medición
+        pcm_mb = audio.samples.nbytes / 2**20
+
+        small = args.small_block
+        paths = {
+            "one-shot": lambda: one_shot(audio),
+            "bloques": lambda: sum(len(block) for block in service.stream(audio)),
+            "reducir_ruido": lambda: service.reducir_ruido(audio),
+            f"bloques de {small}": lambda: sum(len(block) for block in service.stream(audio, small)),
+        }
+        # La diferencia se calcula aparte, fuera de la medición de memoria.
+        outputs = {
+            "bloques": lambda: np.concatenate(list(service.stream(audio))),
+            f"bloques de {small}": lambda: np.concatenate(list(service.stream(audio, small))),
+        }
+        reference = None
+        for name, fn in paths.items():
+            elapsed, peak, result = measure(fn)
+            if name == "one-shot":
+                reference, diff = result, "-"
+            elif name == "reducir_ruido":
+                expected = DecodedAudio.from_array(reference, audio.sample_rate)
+                diff = "0" if np.array_equal(result.samples, expected.samples) else "distinto"
+            else:
+                diff = difference(outputs[name](), reference)
+            print(f"{seconds:<10}{pcm_mb:>10.1f}  {name:<16}{elapsed:>12.2f}{peak:>12.1f}{diff:>9}")
+
+
+if __name__ == "__main__":
+    main()
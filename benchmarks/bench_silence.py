@@ -0,0 +1,66 @@
+"""
+Compara la detección de silencios de pydub con SilenceDetector.
+
+Genera un corpus sintético de WAVs (distintas duraciones, frecuencias de
+muestreo, canales y niveles de ruido de fondo cercanos al umbral), calcula
+las WPM por ambos caminos y verifica que sean idénticas.
+
+Uso: python -m benchmarks.bench_silence [--seconds 30 120 180]
+"""
+import io
+import time
+import argparse
+from pydub import AudioSegment, silence
+from services.WpmService import WpmService
+from benchmarks.fixtures import make_fixture
+
+TEXT = " ".join(["palabra"] * 150)
+MIN_SILENCE_LEN = 2000
+SILENCE_THRESH = -70
+
+
+def wpm_pydub(audio_bytes: bytes, text: str) -> float:
+    """Cálculo original de WpmService, basado en pydub.silence."""
+    audio = AudioSegment.from_file(io.BytesIO(audio_bytes), format="wav")
+    silent_ranges = silence.detect_silence(audio, min_silence_len=MIN_SILENCE_LEN, silence_thresh=SILENCE_THRESH)
+    total_silence = sum((end - start) for start, end in silent_ranges)
+    active_s = max(0, len(audio) - total_silence) / 1000
+    word_count = len(text.split())
+    return word_count / (active_s / 60) if active_s > 0 else 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=int, nargs="+", default=[10, 60, 150])
+    args = parser.parse_args()
+
+    service = WpmService()
+    print(f"{'fixture':<28}{'pydub (s)':>12}{'numpy (s)':>12}{'speedup':>10}  wpm")
+    mismatches = 0
+    seed = 0
+    for seconds in args.seconds:
+        for sample_rate in (8000, 16000, 44100, 48000):
+            for channels in (1, 2):
+                for noise_floor in (0.0, 8.0, 12.0):
+                    seed += 1
+                    audio_bytes = make_fixture(seconds, sample_rate, channels, noise_floor, seed)
+
+                    start = time.perf_counter()
+                    expected = wpm_pydub(audio_bytes, TEXT)
+                    t_pydub = time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    actual = service.calculate(audio_bytes, TEXT, MIN_SILENCE_LEN, SILENCE_THRESH)
+                    t_numpy = time.perf_counter() - start
+
+                    name = f"{seconds}s {sample_rate}Hz {channels}ch n={noise_floor:g}"
+                    status = "ok" if actual == expected else f"DIFF {expected:.4f}"
+                    mismatches += actual != expected
+                    print(f"{name:<28}{t_pydub:>12.3f}{t_numpy:>12.3f}{t_pydub / t_numpy:>9.1f}x  {actual:.4f} {status}")
+
+    if mismatches:
+        raise SystemExit(f"{mismatches} fixtures con WPM distinta")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Proveedor simulado para medir throughput sin gastar créditos de API.
+Emula la latencia (lognormal), la tasa de errores, el tiempo de subida del
+audio y el tamaño de la respuesta de cada modelo real, pasando por el mismo
+ProviderGuard y límite de concurrencia que las estrategias reales.
+"""
+import asyncio
+import random
+from dataclasses import dataclass
+from services.strategies import AudioEvaluationStrategy
+from services.strategies.ProviderGuard import ProviderError
+
+
+@dataclass
+class ProviderProfile:
+    provider: str
+    median_latency: float      # segundos
+    sigma: float               # dispersión de la lognormal
+    error_rate: float          # fracción de llamadas que fallan con 503
+    upload_bytes_per_s: float  # ancho de banda de subida del audio
+    comment_chars: int         # largo de cada comentario de la respuesta
+
+
+PROFILES = {
+    "gemini-flash": ProviderProfile("gemini", 3.0, 0.4, 0.01, 4e6, 220),
+    "gemini-pro": ProviderProfile("gemini", 14.0, 0.5, 0.02, 4e6, 320),
+    "openai-audio": ProviderProfile("openai", 5.0, 0.5, 0.02, 3e6, 260),
+}
+
+
+class FakeProviderStrategy(AudioEvaluationStrategy):
+    """Estrategia que responde como el modelo `name` sin salir de la máquina."""
+
+    def __init__(self, name: str, latency_scale: float = 1.0, error_rate: float | None = None, seed: int = 0):
+        profile = PROFILES[name]
+        self.NAME = name
+        self.LABEL = f"Fake {name}"
+        self.PROVIDER = profile.provider
+        self.profile = profile
+        self.latency_scale = latency_scale
+        self.error_rate = profile.error_rate if error_rate is None else error_rate
+        self.random = random.Random(seed)
+
+    async def evaluate(self, text: str, wpm: float, audio_bytes: bytes, audio_format: str = "wav",
+                       prosody: dict | None = None) -> dict:
+        return await self._call(lambda: self._request(len(audio_bytes)))
+
+    async def _request(self, payload_size: int) -> dict:
+        profile = self.profile
+        latency = self.random.lognormvariate(0, profile.sigma) * profile.median_latency
+        latency += payload_size / profile.upload_bytes_per_s
+        await asyncio.sleep(latency * self.latency_scale)
+        if self.random.random() < self.error_rate:
+            raise ProviderError(f"Error {self.LABEL}: 503 simulado", status=503)
+        comment = "x" * profile.comment_chars
+        return {k: {"nivel": "Logrado", "comentario": comment} for k in self.CRITERIA}
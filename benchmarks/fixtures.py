@@ -0,0 +1,27 @@
+"""Audios sintéticos para los benchmarks."""
+import io
+import wave
+import numpy as np
+
+
+def make_fixture(seconds: int, sample_rate: int, channels: int, noise_floor: float, seed: int) -> bytes:
+    """WAV de 16 bits que alterna habla simulada con pausas de distinto largo."""
+    rng = np.random.default_rng(seed)
+    total = seconds * sample_rate
+    signal = rng.normal(0, noise_floor, size=total)
+    position = int(rng.uniform(0.5, 4) * sample_rate)
+    while position < total:
+        burst = int(rng.uniform(0.3, 6) * sample_rate)
+        t = np.arange(min(burst, total - position)) / sample_rate
+        signal[position:position + t.size] += 6000 * np.sin(2 * np.pi * rng.uniform(120, 300) * t)
+        position += burst + int(rng.uniform(0.2, 4) * sample_rate)
+    pcm = np.clip(np.round(signal), -32768, 32767).astype(np.int16)
+    pcm = np.repeat(pcm[:, None], channels, axis=1)
+
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return out.getvalue()
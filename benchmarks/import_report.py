@@ -0,0 +1,79 @@
+"""
+Reporte del costo de importación al arrancar la app (arranque en frío).
+
+Ejecuta `python -X importtime` en procesos nuevos y muestra:
+- el tiempo total de `import main` (mediana de --repeat corridas),
+- los módulos con mayor tiempo acumulado y el costo por paquete,
+- lo que agrega la carga diferida de cada estrategia y del pipeline DSP
+  en el primer uso.
+
+Uso: python -m benchmarks.import_report [--repeat 5] [--top 15]
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+
+
+def importtime(statement: str) -> list[tuple[str, int, int, int]]:
+    """Corre statement en un proceso nuevo; retorna (módulo, propio_us, acumulado_us, nivel)."""
+    env = {**os.environ, "PYTHONPATH": os.getcwd(), "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        level = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), level))
+    return rows
+
+
+def total_ms(rows) -> float:
+    return sum(cumulative for _, _, cumulative, level in rows if level == 0) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [importtime("import main") for _ in range(args.repeat)]
+    rows = runs[-1]
+    print(f"import main: {statistics.median(total_ms(r) for r in runs):.0f} ms (mediana de {args.repeat})\n")
+
+    print(f"{'módulo':<50}{'acumulado (ms)':>16}")
+    for name, _, cumulative, _ in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"{name:<50}{cumulative / 1000:>16.1f}")
+
+    packages = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    print(f"\n{'paquete':<50}{'propio (ms)':>16}")
+    for name, self_us in sorted(packages.items(), key=lambda p: -p[1])[:args.top]:
+        print(f"{name:<50}{self_us / 1000:>16.1f}")
+
+    # Costo extra que paga la primera request de cada modelo / del pipeline.
+    lazy = {
+        "pipeline DSP": "import main; import services.AudioPipeline",
+        **{
+            model: "import main; from services.strategies import EvaluationStrategyFactory as F, EvaluationModel as M; "
+                   f"F._load(F._strategies[M('{model}')])"
+            for model in ("gemini-flash", "gemini-pro", "openai-audio")
+        },
+    }
+    base = statistics.median(total_ms(r) for r in runs)
+    print(f"\n{'carga diferida (primer uso)':<50}{'extra (ms)':>16}")
+    for label, statement in lazy.items():
+        extra = statistics.median(total_ms(importtime(statement)) for _ in range(args.repeat)) - base
+        print(f"{label:<50}{extra:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,30 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+import os
+import json
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from services.EvaluationService import EvaluationService
+from services.UploadReader import UploadReader, UploadTooLargeError
+from services.DspPool import DspPoolSaturatedError
+from services.Metrics import Metrics
+from services.JobService import JobService, JobQueueFullError
+from services.strategies import EvaluationStrategyFactory
+from services.strategies.ProviderGuard import ProviderGuard, ProviderError, ProviderUnavailableError
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    EvaluationStrategyFactory.startup()
+    await evaluation_service.start()
+    await job_service.start()
+    yield
+    await job_service.stop()
+    evaluation_service.close()
+    await EvaluationStrategyFactory.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -11,7 +33,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def _megabytes(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(float(value) * 1024 * 1024) if value else default
+
+
+# Por defecto, un archivo del máximo permitido más el resto del formulario;
+# el lote admite hasta BATCH_MAX_FILES de esos archivos.
+MAX_REQUEST_BYTES = _megabytes("MAX_REQUEST_MB", UploadReader.default_max_bytes() + 1024 * 1024)
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "45"))
+MAX_BATCH_REQUEST_BYTES = _megabytes("MAX_BATCH_REQUEST_MB", UploadReader.default_max_bytes() * BATCH_MAX_FILES)
+
+
+@app.middleware("http")
+async def limitar_tamano(request: Request, call_next):
+    """Rechaza por Content-Length antes de recibir y parsear el cuerpo."""
+    limit = MAX_BATCH_REQUEST_BYTES if request.url.path == "/evaluar-lectura/batch" else MAX_REQUEST_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        return JSONResponse(status_code=413, content={"detail": "La request supera el tamaño máximo permitido."})
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    """Agrega el header Server-Timing con las etapas medidas (SERVER_TIMING=true)."""
+    timings = Metrics.start_request()
+    response = await call_next(request)
+    if timings:
+        response.headers["Server-Timing"] = Metrics.server_timing_header(timings)
+    return response
+
+
 evaluation_service = EvaluationService()
+job_service = JobService(evaluation_service)
 
 @app.post("/evaluar-lectura")
 async def evaluar_lectura(
@@ -23,15 +78,115 @@ async def evaluar_lectura(
     Parámetros:
     - text: Texto a leer
     - audio: Archivo de audio
-    - model: 'gemini-flash', 'gemini-pro' o 'openai-audio'
+    - model: 'gemini-flash', 'gemini-pro', 'openai-audio' o 'auto'
     """
     try:
         result = await evaluation_service.handle(text, audio, model)
         return result
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except DspPoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ProviderUnavailableError as e:
+        headers = {"Retry-After": str(int(e.retry_after))} if e.retry_after else None
+        raise HTTPException(status_code=503, detail=str(e), headers=headers)
+    except ProviderError as e:
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     
 
+@app.post("/evaluar-lectura/batch")
+async def evaluar_lectura_batch(
+    text: str = Form(...),
+    audios: list[UploadFile] = File(...),
+    model: str = Form(default="gemini-flash")
+):
+    """
+    Evalúa las grabaciones de todo un curso sobre el mismo texto.
+    Responde NDJSON: una línea por alumno, en el orden en que terminan.
+    """
+    if len(audios) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"El lote admite hasta {BATCH_MAX_FILES} grabaciones.")
+    try:
+        EvaluationStrategyFactory.create(model)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Cada archivo queda en su archivo temporal (a disco si es grande), no en memoria.
+    files = []
+    try:
+        for audio in audios:
+            files.append((audio.filename, await evaluation_service.uploads.read(audio)))
+    except UploadTooLargeError as e:
+        for _, buffer in files:
+            buffer.close()
+        raise HTTPException(status_code=413, detail=f"{audio.filename}: {e}")
+
+    async def lines():
+        try:
+            async for result in evaluation_service.evaluate_batch(text, files, model):
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        finally:
+            for _, buffer in files:
+                buffer.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/jobs", status_code=202)
+async def crear_job(
+    text: str = Form(...),
+    audio: UploadFile = File(...),
+    model: str = Form(default="gemini-flash")
+):
+    """Encola la evaluación y retorna el id del trabajo sin esperar al modelo."""
+    try:
+        buffer = await evaluation_service.uploads.read(audio)
+        try:
+            # Si se encola, el trabajo se queda con el archivo y lo cierra al terminar.
+            return await job_service.submit(text, buffer, model)
+        except BaseException:
+            buffer.close()
+            raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/jobs/{job_id}")
+async def obtener_job(job_id: str, wait: float = 0):
+    """
+    Estado y resultado del trabajo.
+    - wait: segundos a esperar a que termine (long-poll, máximo 60)
+    """
+    job = await job_service.get(job_id, wait=min(max(wait, 0), 60))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return job
+
+
+@app.get("/proveedores")
+def proveedores():
+    """Estado del circuit breaker y del limitador de tasa de cada proveedor."""
+    return ProviderGuard.states()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Métricas en formato Prometheus."""
+    return Metrics.render()
+
+
+@app.get("/estadisticas")
+def estadisticas():
+    """Contadores de cache y de requests coalescidas."""
+    return evaluation_service.stats()
+
+
 @app.get("/")
 def read_root():    
     return {"message": "Hello from FastAPI on Vercel"}
\ No newline at end of file
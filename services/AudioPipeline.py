@@ -0,0 +1,70 @@
+import os
+from dataclasses import dataclass, field
+from .DecodedAudio import DecodedAudio
+from .WpmService import WpmService
+from .AudioTrimService import AudioTrimService
+from .AudioPreprocessService import AudioPreprocessService
+from .ProsodyService import ProsodyService
+from .Metrics import Metrics
+from .DspPool import SharedBuffer
+
+
+@dataclass
+class AudioAnalysis:
+    """Resultado de las etapas locales, listo para la llamada al modelo."""
+    fingerprint: str
+    wpm: float
+    recorte: dict
+    payload: bytes
+    audio_format: str
+    pcm_bytes: int = 0
+    prosodia: dict | None = None
+    etapas: list = field(default_factory=list)
+
+
+class AudioPipeline:
+    """
+    Etapas DSP locales: silencios, WPM, recorte y preprocesado del audio.
+    Con PROSODY_ENABLED también los rasgos prosódicos, que van al prompt.
+    """
+
+    def __init__(self):
+        self.wpm = WpmService()
+        self.trim = AudioTrimService()
+        self.preprocess = AudioPreprocessService()
+        self.prosody = ProsodyService() if os.getenv("PROSODY_ENABLED", "false").lower() == "true" else None
+
+    def run(self, audio: DecodedAudio, text: str, audio_format: str = "wav") -> AudioAnalysis:
+        silent_ranges = self.wpm.silent_ranges(audio)
+        wpm_value = self.wpm.calculate(audio, text, silent_ranges=silent_ranges)
+        with Metrics.stage("recorte"):
+            trimmed, trim_info = self.trim.trim(audio, silent_ranges)
+        with Metrics.stage("preprocesado"):
+            # Una sola versión de habla (mono, remuestreada) para el modelo y la prosodia.
+            speech = trimmed.to_speech(self.preprocess.sample_rate)
+            payload, payload_format = self.preprocess.prepare(speech, audio_format)
+        prosody = None
+        if self.prosody is not None:
+            prosody = self.prosody.analyze(speech.as_float(), speech.sample_rate, text)
+        return AudioAnalysis(audio.fingerprint, wpm_value, trim_info, payload, payload_format,
+                             len(audio.segment.raw_data), prosody)
+
+
+_pipeline: AudioPipeline | None = None
+
+
+def analyze_audio(source, text: str, audio_format: str = "wav") -> AudioAnalysis:
+    """
+    Decodifica y analiza el audio; se ejecuta en un worker de DspPool.
+    source son los bytes/archivo del audio o un SharedHandle.
+    """
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = AudioPipeline()
+    with Metrics.collect() as timings, SharedBuffer.open(source) as data:
+        audio = DecodedAudio(data)
+        with Metrics.stage("decode"):
+            audio.samples
+        analysis = _pipeline.run(audio, text, audio_format)
+    analysis.etapas = timings
+    return analysis
@@ -0,0 +1,33 @@
+import os
+import logging
+from .DecodedAudio import DecodedAudio
+
+logger = logging.getLogger(__name__)
+
+
+class AudioPreprocessService:
+    """
+    Prepara el audio que se envía al modelo: mono, remuestreado a una
+    frecuencia de habla (AUDIO_TARGET_SAMPLE_RATE, 16 kHz por defecto) y,
+    si AUDIO_COMPACT_CODEC=true, codificado en el formato compacto que
+    prefiere la estrategia.
+    """
+
+    def __init__(self, sample_rate: int | None = None, compact: bool | None = None):
+        self.sample_rate = sample_rate or int(os.getenv("AUDIO_TARGET_SAMPLE_RATE", "16000"))
+        if compact is None:
+            compact = os.getenv("AUDIO_COMPACT_CODEC", "false").lower() == "true"
+        self.compact = compact
+
+    def prepare(self, audio: DecodedAudio, audio_format: str = "wav") -> tuple[bytes, str]:
+        """
+        Retorna (bytes, formato) listos para la estrategia.
+        Si el códec compacto no está disponible (p. ej. falta ffmpeg) se usa WAV.
+        """
+        speech = audio.to_speech(self.sample_rate)
+        if self.compact and audio_format != "wav":
+            try:
+                return speech.encode(audio_format), audio_format
+            except Exception as e:
+                logger.warning("No se pudo codificar en %s, se envía WAV: %s", audio_format, e)
+        return speech.wav_bytes, "wav"
@@ -0,0 +1,36 @@
+import os
+from .DecodedAudio import DecodedAudio
+
+
+class AudioTrimService:
+    """
+    Recorta el silencio inicial y final antes de enviar el audio al modelo.
+    Usa los mismos rangos silenciosos que WpmService, dejando TRIM_PAD_MS
+    (500 ms por defecto) de margen a cada lado del habla.
+    """
+
+    def __init__(self, pad_ms: int | None = None):
+        self.pad_ms = pad_ms if pad_ms is not None else int(os.getenv("TRIM_PAD_MS", "500"))
+
+    def bounds(self, silent_ranges: list[list[int]], duration_ms: int) -> tuple[int, int]:
+        """Retorna (inicio_ms, fin_ms) del tramo con habla."""
+        start, end = 0, duration_ms
+        if silent_ranges and silent_ranges[0][0] <= 0:
+            start = max(0, silent_ranges[0][1] - self.pad_ms)
+        if silent_ranges and silent_ranges[-1][1] >= duration_ms:
+            end = min(duration_ms, silent_ranges[-1][0] + self.pad_ms)
+        if start >= end:
+            # Todo el audio es silencio: no se recorta.
+            return 0, duration_ms
+        return start, end
+
+    def trim(self, audio: DecodedAudio, silent_ranges: list[list[int]]) -> tuple[DecodedAudio, dict]:
+        """Retorna el audio recortado y los metadatos del recorte."""
+        duration_ms = audio.duration_ms
+        start, end = self.bounds(silent_ranges, duration_ms)
+        return audio.slice(start, end), {
+            'inicio_ms': start,
+            'fin_ms': end,
+            'duracion_original_ms': duration_ms,
+            'duracion_recortada_ms': end - start,
+        }
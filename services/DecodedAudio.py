@@ -0,0 +1,151 @@
+import io
+import wave
+import hashlib
+from functools import cached_property
+from typing import BinaryIO
+import numpy as np
+from pydub import AudioSegment
+
+
+class DecodedAudio:
+    """
+    Audio de una request, decodificado una sola vez.
+    La decodificación es perezosa: ocurre en el primer acceso a las muestras y
+    el resultado se comparte entre todos los servicios del pipeline.
+    """
+
+    _DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+    # Códec de ffmpeg para los formatos comprimidos que aceptan los proveedores.
+    _CODECS = {"flac": "flac", "ogg": "libopus", "mp3": "libmp3lame"}
+
+    def __init__(self, data: bytes | BinaryIO | None, format: str | None = "wav"):
+        # data puede ser bytes o un archivo (p. ej. el buffer de UploadReader),
+        # que se lee directamente sin copiarlo antes a un bytes intermedio.
+        self.data = data
+        self.format = format
+
+    @classmethod
+    def of(cls, audio: "DecodedAudio | bytes | BinaryIO") -> "DecodedAudio":
+        """Envuelve bytes crudos; si ya es un DecodedAudio lo retorna tal cual."""
+        return audio if isinstance(audio, cls) else cls(audio)
+
+    @classmethod
+    def from_array(cls, samples: np.ndarray, sample_rate: int) -> "DecodedAudio":
+        """
+        Crea un DecodedAudio a partir de muestras ya procesadas.
+
+        :param samples: float en [-1, 1] o PCM int16, con forma (frames,) o (frames, canales).
+        """
+        if np.issubdtype(samples.dtype, np.floating):
+            samples = np.clip(samples, -1.0, 1.0) * 32767
+        pcm = np.asarray(samples).astype(np.int16)
+        if pcm.ndim == 1:
+            pcm = pcm[:, None]
+        audio = cls(None)
+        audio.segment = AudioSegment(
+            data=np.ascontiguousarray(pcm).tobytes(),
+            sample_width=2,
+            frame_rate=sample_rate,
+            channels=pcm.shape[1],
+        )
+        return audio
+
+    @cached_property
+    def segment(self) -> AudioSegment:
+        source = self._source()
+        if self.format == "wav":
+            # Camino rápido: los frames PCM se leen una sola vez con wave y
+            # AudioSegment los usa sin volver a copiarlos.
+            try:
+                with wave.open(source) as wav:
+                    if wav.getsampwidth() in (2, 4):
+                        return AudioSegment(
+                            data=wav.readframes(wav.getnframes()),
+                            sample_width=wav.getsampwidth(),
+                            frame_rate=wav.getframerate(),
+                            channels=wav.getnchannels(),
+                        )
+            except (wave.Error, EOFError):
+                pass  # WAV no PCM (float, extensible, 8/24 bits...): lo resuelve pydub
+            source.seek(0)
+        return AudioSegment.from_file(source, format=self.format)
+
+    def _source(self) -> BinaryIO:
+        if isinstance(self.data, (bytes, bytearray, memoryview)):
+            return io.BytesIO(self.data)
+        self.data.seek(0)
+        return self.data
+
+    @cached_property
+    def samples(self) -> np.ndarray:
+        """PCM entero (sin copia) con forma (frames, canales)."""
+        pcm = np.frombuffer(self.segment.raw_data, dtype=self._DTYPES[self.sample_width])
+        return pcm.reshape(-1, self.channels)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Hash del PCM decodificado: no depende del contenedor ni de sus metadatos."""
+        digest = hashlib.sha256(f"{self.sample_rate}:{self.channels}:{self.sample_width}:".encode())
+        digest.update(self.segment.raw_data)
+        return digest.hexdigest()
+
+    @property
+    def sample_rate(self) -> int:
+        return self.segment.frame_rate
+
+    @property
+    def channels(self) -> int:
+        return self.segment.channels
+
+    @property
+    def sample_width(self) -> int:
+        return self.segment.sample_width
+
+    @property
+    def duration(self) -> float:
+        """Duración en segundos."""
+        return self.samples.shape[0] / self.sample_rate
+
+    @property
+    def duration_ms(self) -> int:
+        """Duración en milisegundos, redondeada igual que len(AudioSegment)."""
+        return len(self.segment)
+
+    def as_float(self) -> np.ndarray:
+        """Señal mono en float32 normalizada a [-1, 1] (como librosa.load)."""
+        scale = float(1 << (8 * self.sample_width - 1))
+        mono = self.samples.mean(axis=1, dtype=np.float32) if self.channels > 1 else self.samples[:, 0]
+        return mono.astype(np.float32) / scale
+
+    def slice(self, start_ms: int, end_ms: int) -> "DecodedAudio":
+        """Fragmento [start_ms, end_ms); sin copia si abarca todo el audio."""
+        if start_ms <= 0 and end_ms >= self.duration_ms:
+            return self
+        audio = DecodedAudio(None)
+        audio.segment = self.segment[start_ms:end_ms]
+        return audio
+
+    def to_speech(self, sample_rate: int = 16000) -> "DecodedAudio":
+        """Versión mono, 16 bits y a la frecuencia indicada (sin copia si ya lo es)."""
+        if self.channels == 1 and self.sample_rate == sample_rate and self.sample_width == 2:
+            return self
+        audio = DecodedAudio(None)
+        audio.segment = self.segment.set_channels(1).set_sample_width(2).set_frame_rate(sample_rate)
+        return audio
+
+    def encode(self, format: str) -> bytes:
+        """Codifica el audio en el formato pedido ('wav', 'flac', 'ogg', 'mp3')."""
+        if format == "wav":
+            return self.wav_bytes
+        out = io.BytesIO()
+        self.segment.export(out, format=format, codec=self._CODECS.get(format))
+        return out.getvalue()
+
+    @cached_property
+    def wav_bytes(self) -> bytes:
+        """Audio como WAV; si el original ya era WAV se reutilizan sus bytes."""
+        if self.data is not None and self.format == "wav":
+            return self.data if isinstance(self.data, bytes) else self._source().read()
+        out = io.BytesIO()
+        self.segment.export(out, format="wav")
+        return out.getvalue()
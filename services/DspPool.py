@@ -0,0 +1,241 @@
+import io
+import os
+import asyncio
+import logging
+import multiprocessing
+from contextlib import contextmanager
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, BinaryIO, Callable
+from .Metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+class DspPoolSaturatedError(Exception):
+    """No hubo lugar en el pool DSP dentro de DSP_QUEUE_TIMEOUT segundos, o sus workers se cayeron."""
+
+
+@dataclass(frozen=True)
+class SharedHandle:
+    """Referencia picklable a un bloque de memoria compartida."""
+    name: str
+    size: int
+
+
+class SharedBuffer:
+    """
+    Entrega de datos a los workers sin serializarlos: el proceso principal
+    copia el audio una vez a memoria compartida y el worker lo lee en el lugar.
+    """
+
+    @staticmethod
+    @contextmanager
+    def create(source: bytes | BinaryIO):
+        """Crea el bloque con el contenido de source y lo libera al salir."""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            size = len(source)
+        else:
+            source.seek(0, os.SEEK_END)
+            size = source.tell()
+            source.seek(0)
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                shm.buf[:size] = source
+            else:
+                view = shm.buf[:size]
+                offset = 0
+                while offset < size:
+                    read = source.readinto(view[offset:])
+                    if not read:
+                        break
+                    offset += read
+                view.release()
+            yield SharedHandle(shm.name, size)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    @staticmethod
+    @contextmanager
+    def open(source: Any):
+        """
+        Del lado del worker: si source es un SharedHandle lo expone como
+        archivo de solo lectura sobre la memoria compartida; si no, lo
+        retorna tal cual.
+        """
+        if not isinstance(source, SharedHandle):
+            yield source
+            return
+        # Los workers se crean con spawn y comparten el resource tracker del
+        # proceso principal, que es quien libera el bloque: el worker no lo
+        # desregistra (le quitaría el registro al dueño).
+        shm = shared_memory.SharedMemory(name=source.name)
+        view = shm.buf[:source.size]
+        reader = _MemoryReader(view)
+        try:
+            yield reader
+        finally:
+            reader.close()
+            view.release()
+            shm.close()
+
+
+class _MemoryReader(io.RawIOBase):
+    """Archivo de solo lectura sobre un memoryview, sin copiarlo completo."""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else min(len(self._view), self._pos + size)
+        chunk = bytes(self._view[self._pos:end])
+        self._pos = end
+        return chunk
+
+    def readinto(self, buffer) -> int:
+        chunk = self.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._pos, os.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+def _warm_worker() -> None:
+    """Inicializador de cada worker: importa de antemano las dependencias DSP."""
+    import numpy  # noqa: F401
+    import pydub  # noqa: F401
+    from . import AudioPipeline  # noqa: F401
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class DspPool:
+    """
+    Pool de procesos para las etapas DSP (decodificación, silencios,
+    remuestreo...), así el event loop no se bloquea con trabajo de CPU.
+    - DSP_WORKERS: procesos (por defecto, uno por núcleo; 0 = hilo en el
+      mismo proceso, p. ej. en entornos serverless sin /dev/shm).
+    - DSP_MAX_PENDING: tareas admitidas a la vez (en ejecución + en cola).
+    - DSP_QUEUE_TIMEOUT: segundos a esperar lugar antes de rechazar.
+    - DSP_PREWARM: levanta los workers al iniciar la app.
+    Si un worker muere (OOM, crash de una librería nativa) el pool se
+    reconstruye y la tarea se reintenta una vez.
+    """
+
+    def __init__(self, workers: int | None = None):
+        self.workers = workers if workers is not None else int(os.getenv("DSP_WORKERS", os.cpu_count() or 1))
+        self.max_pending = int(os.getenv("DSP_MAX_PENDING", max(1, self.workers) * 4))
+        self.queue_timeout = float(os.getenv("DSP_QUEUE_TIMEOUT", "10"))
+        self.prewarm = os.getenv("DSP_PREWARM", "true").lower() == "true"
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self.pending = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    @property
+    def concurrency(self) -> int:
+        """Tareas que el pool ejecuta a la vez (sin contar la cola)."""
+        return self.workers if self.workers > 0 else self.max_pending
+
+    @property
+    def uses_processes(self) -> bool:
+        return self._executor is not None
+
+    async def start(self) -> None:
+        if self.workers <= 0 or self._executor is not None:
+            return
+        try:
+            self._executor = self._new_executor()
+            if self.prewarm:
+                loop = asyncio.get_running_loop()
+                await asyncio.gather(*(loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)))
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            logger.warning("No se pudo crear el pool DSP, se usa un hilo: %s", e)
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn y no fork: los workers no heredan el estado del proceso
+        # principal (hilos, clientes, resource tracker a medio iniciar).
+        return ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_warm_worker, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def _replace(self, broken: ProcessPoolExecutor) -> None:
+        """Reemplaza un pool roto; si otra tarea ya lo reemplazó, no hace nada."""
+        if self._executor is not broken:
+            return
+        logger.warning("Se cayó un worker DSP, se reconstruye el pool")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+        self.restarts += 1
+        Metrics.inc("dsp_pool_reinicios_total")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def run(self, fn: Callable, source: bytes | BinaryIO, *args, wait_for_slot: bool = False) -> Any:
+        """
+        Ejecuta fn(source, *args) en un worker. source (el audio) viaja por
+        memoria compartida; fn debe abrirlo con SharedBuffer.open.
+        Con wait_for_slot espera lugar sin DSP_QUEUE_TIMEOUT (para trabajo
+        interno que ya acota cuánto envía, como los lotes).
+        """
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=None if wait_for_slot else self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise DspPoolSaturatedError("El servidor está saturado, reintentá en unos segundos.")
+        self.pending += 1
+        try:
+            if self._executor is None:
+                return await asyncio.to_thread(fn, source, *args)
+            loop = asyncio.get_running_loop()
+            with SharedBuffer.create(source) as handle:
+                for _ in range(2):
+                    executor = self._executor
+                    try:
+                        return await loop.run_in_executor(executor, fn, handle, *args)
+                    except BrokenProcessPool:
+                        self._replace(executor)
+            raise DspPoolSaturatedError("El procesamiento de audio se reinició, reintentá en unos segundos.")
+        finally:
+            self.pending -= 1
+            self._slots.release()
+
+    def worker_pids(self) -> list[int]:
+        """PIDs de los workers vivos, para medir su CPU y memoria desde afuera."""
+        if self._executor is None:
+            return []
+        return list(self._executor._processes or {})
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers if self.uses_processes else 0,
+            "en_curso": self.pending,
+            "rechazadas": self.rejected,
+            "reinicios": self.restarts,
+        }
@@ -0,0 +1,91 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from .Metrics import Metrics
+
+
+class EvaluationCache:
+    """
+    Cache de resultados de evaluación en dos niveles:
+    - memoria: LRU con TTL (CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS);
+    - disco (opcional): SQLite en CACHE_DB_PATH, compartido entre reinicios.
+    """
+
+    def __init__(self, max_entries: int | None = None, ttl: float | None = None, db_path: str | None = None,
+                 name: str = "evaluacion"):
+        self.name = name
+        self.max_entries = max_entries or int(os.getenv("CACHE_MAX_ENTRIES", "512"))
+        self.ttl = ttl or float(os.getenv("CACHE_TTL_SECONDS", "86400"))
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        db_path = db_path or os.getenv("CACHE_DB_PATH")
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires_at REAL, value TEXT)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        """Clave estable a partir de las partes que identifican una evaluación."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x1f")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                Metrics.inc("cache_total", cache=self.name, resultado="acierto", nivel="memoria")
+                return entry[1]
+            self._entries.pop(key, None)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT expires_at, value FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[0] > now:
+                    value = json.loads(row[1])
+                    self._remember(key, row[0], value)
+                    self.hits += 1
+                    Metrics.inc("cache_total", cache=self.name, resultado="acierto", nivel="disco")
+                    return value
+
+            self.misses += 1
+            Metrics.inc("cache_total", cache=self.name, resultado="fallo")
+            return None
+
+    def set(self, key: str, value: dict) -> None:
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (key, expires_at, value) VALUES (?, ?, ?)",
+                    (key, expires_at, json.dumps(value, ensure_ascii=False)),
+                )
+                self._db.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+                self._db.commit()
+
+    def stats(self) -> dict:
+        return {"entradas": len(self._entries), "aciertos": self.hits, "fallos": self.misses}
+
+    def _remember(self, key: str, expires_at: float, value: dict) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
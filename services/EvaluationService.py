@@ -1,36 +1,221 @@
+import os
+import asyncio
+import hashlib
+from typing import TYPE_CHECKING, AsyncIterator, BinaryIO
 from fastapi import UploadFile
+from .DspPool import DspPool
+from .EvaluationCache import EvaluationCache
+from .SingleFlight import SingleFlight
+from .FluencyRubricService import FluencyRubricService
+from .Metrics import Metrics
+from .UploadReader import UploadReader
 from .TextAudioEquivalentService import TextAudioEquivalentService
-from .WpmService import WpmService
-from .strategies import EvaluationStrategyFactory
+from .strategies import EvaluationStrategyFactory, AudioEvaluationStrategy
 #from .NoiseReduceService import NoiseReduceService
 #from .VoiceSeparatorService import VoiceSeparatorService
 
+if TYPE_CHECKING:
+    from .AudioPipeline import AudioAnalysis
+
 class EvaluationService:
     def __init__(self):
-        #self.text_audio = TextAudioEquivalentService()
-        self.wpm = WpmService()
+        # TEXT_MATCH_CHECK: verifica que el audio corresponda al texto (transcribiéndolo).
+        self.text_audio = TextAudioEquivalentService() if os.getenv("TEXT_MATCH_CHECK", "false").lower() == "true" else None
+        self.uploads = UploadReader()
+        self.dsp = DspPool()
+        self.fluency = FluencyRubricService()
+        self.cache = EvaluationCache()
+        self.inflight = SingleFlight()
+        self.batch_concurrency = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+        # Lo lee también AudioPipeline en los workers; acá separa las claves de cache.
+        self.prosody = os.getenv("PROSODY_ENABLED", "false").lower() == "true"
         #self.nr = NoiseReduceService()
         #self.vs = VoiceSeparatorService()
 
     async def handle(self, text: str, audio: UploadFile, model: str = "gemini-flash"):
         """Evalúa lectura con modelo especificado."""
-        audio_bytes = await audio.read()
-
-        #match_info = await self.text_audio.verify(audio_bytes, text)
-        #if not match_info['match']:
-        #    return {
-        #        "error": "El texto proporcionado no coincide con el audio.",
-        #        **match_info
-        #    }
-        
-        wpm_value = self.wpm.calculate(audio_bytes, text)
-        
+        with Metrics.stage("upload"):
+            buffer = await self.uploads.read(audio)
+        with buffer:
+            return await self.evaluate(text, buffer, model)
+
+    async def evaluate(self, text: str, audio_bytes: bytes | BinaryIO, model: str = "gemini-flash"):
+        """
+        Evalúa la lectura a partir de los bytes (o el archivo) del audio.
+        Las etapas corren como un grafo de tareas:
+          verificación texto/audio ──────────────┐
+          DSP (silencios, WPM, recorte) ─> modelo ─┴─> resultado
+        La verificación arranca con el audio original, en paralelo con el DSP
+        y la llamada al modelo; si el texto no coincide, el modelo se cancela.
+        La cache se consulta antes por el contenido subido (un acierto no pasa
+        por el pool DSP) y después por la huella del audio decodificado.
+        """
         strategy = EvaluationStrategyFactory.create(model)
-        evaluation = await strategy.evaluate(text, wpm_value, audio_bytes)
-        
-        return {
-            #**match_info,
-            'palabras_por_minuto': round(wpm_value, 2),
-            'modelo': model,
+        upload_key = await self._upload_cache_key(audio_bytes, text, model, strategy)
+        cached = self.cache.get(upload_key)
+        if cached is not None:
+            return {**cached, 'desde_cache': True}
+
+        verification = self._verify(audio_bytes, text)
+        try:
+            # Decodificación y etapas DSP en un worker: el event loop queda libre.
+            analysis = await self._analyze(audio_bytes, text, strategy)
+            cache_key = self._cache_key(analysis, text, model, strategy)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.cache.set(upload_key, cached)
+                return {**cached, 'desde_cache': True}
+
+            #decoded = self.nr.reducir_ruido(decoded)
+            #decoded = await self.vs.separar_voces_async(decoded)
+
+            return await self._evaluate_analysis(analysis, text, model, strategy, cache_key, upload_key, verification)
+        finally:
+            if verification is not None:
+                verification.cancel()
+
+    async def evaluate_batch(self, text: str, audios: list[tuple[str, bytes | BinaryIO]], model: str = "gemini-flash") -> AsyncIterator[dict]:
+        """
+        Evalúa muchas grabaciones del mismo texto. El análisis local corre en
+        paralelo en el pool DSP y las llamadas al modelo se acotan a
+        BATCH_MAX_CONCURRENCY. Los resultados se emiten a medida que terminan.
+        El lote envía al pool a lo sumo una grabación por worker y espera su
+        turno sin timeout: la saturación es solo para la carga de afuera.
+        """
+        strategy = EvaluationStrategyFactory.create(model)
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+        dsp_slots = asyncio.Semaphore(self.dsp.concurrency)
+
+        async def evaluate_one(index: int, filename: str, audio_bytes: bytes | BinaryIO) -> dict:
+            verification = None
+            try:
+                upload_key = await self._upload_cache_key(audio_bytes, text, model, strategy)
+                cached = self.cache.get(upload_key)
+                if cached is not None:
+                    return {'indice': index, 'archivo': filename, **cached, 'desde_cache': True}
+                verification = self._verify(audio_bytes, text)
+                async with dsp_slots:
+                    analysis = await self._analyze(audio_bytes, text, strategy, wait_for_slot=True)
+                cache_key = self._cache_key(analysis, text, model, strategy)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self.cache.set(upload_key, cached)
+                    return {'indice': index, 'archivo': filename, **cached, 'desde_cache': True}
+                async with semaphore:
+                    result = await self._evaluate_analysis(
+                        analysis, text, model, strategy, cache_key, upload_key, verification
+                    )
+                return {'indice': index, 'archivo': filename, **result}
+            except Exception as e:
+                return {'indice': index, 'archivo': filename, 'error': str(e)}
+            finally:
+                if verification is not None:
+                    verification.cancel()
+
+        tasks = [asyncio.create_task(evaluate_one(i, name, data)) for i, (name, data) in enumerate(audios)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _analyze(self, audio: bytes | BinaryIO, text: str, strategy: AudioEvaluationStrategy,
+                       wait_for_slot: bool = False) -> "AudioAnalysis":
+        # numpy/pydub se cargan recién con el primer audio (o en los workers).
+        from .AudioPipeline import analyze_audio
+
+        analysis = await self.dsp.run(analyze_audio, audio, text, strategy.AUDIO_FORMAT, wait_for_slot=wait_for_slot)
+        # Las etapas se midieron en el worker; se registran acá.
+        for name, seconds in analysis.etapas:
+            Metrics.record_stage(name, seconds)
+        Metrics.observe("audio_bytes", analysis.pcm_bytes, Metrics.BYTES_BUCKETS, tipo="pcm")
+        return analysis
+
+    def _verify(self, audio: bytes | BinaryIO, text: str) -> asyncio.Task | None:
+        """Lanza la verificación texto/audio (con TEXT_MATCH_CHECK) como tarea aparte."""
+        if self.text_audio is None:
+            return None
+        if not isinstance(audio, (bytes, bytearray)):
+            # Se lee ahora: el pool DSP usa el mismo archivo en paralelo.
+            audio.seek(0)
+            audio = audio.read()
+        return asyncio.create_task(self.text_audio.verify(audio, text))
+
+    async def _evaluate_analysis(self, analysis: "AudioAnalysis", text: str, model: str,
+                                 strategy: AudioEvaluationStrategy, cache_key: str, upload_key: str,
+                                 verification: asyncio.Task | None = None) -> dict:
+        # Requests idénticas en vuelo comparten una sola llamada al modelo.
+        model_call = asyncio.ensure_future(self.inflight.run(
+            cache_key, lambda: self._call_model(analysis, text, model, strategy)
+        ))
+        try:
+            match_info = await verification if verification is not None else {}
+            if match_info and not match_info['match']:
+                return {
+                    "error": "El texto proporcionado no coincide con el audio.",
+                    **match_info
+                }
+            result = {**match_info, **await model_call}
+        finally:
+            if not model_call.done():
+                model_call.cancel()
+            elif not model_call.cancelled():
+                model_call.exception()  # ya informada o irrelevante; evita el aviso de asyncio
+        # Se guarda recién con la verificación aprobada.
+        self.cache.set(cache_key, result)
+        self.cache.set(upload_key, result)
+        return {**result, 'desde_cache': False}
+
+    async def _call_model(self, analysis: "AudioAnalysis", text: str, model: str,
+                          strategy: AudioEvaluationStrategy) -> dict:
+        Metrics.observe("audio_bytes", len(analysis.payload), Metrics.BYTES_BUCKETS, tipo=analysis.audio_format)
+        with Metrics.stage("modelo", modelo=model):
+            model_used, evaluation = await strategy.evaluate_with_model(
+                text, analysis.wpm, analysis.payload, analysis.audio_format, prosody=analysis.prosodia
+            )
+        # El modelo evalúa los criterios perceptuales; la fluidez sale de las WPM.
+        evaluation = {**evaluation, 'fluidez_lectora': self.fluency.evaluate(analysis.wpm)}
+
+        result = {
+            'palabras_por_minuto': round(analysis.wpm, 2),
+            'modelo': model_used,
+            'recorte': analysis.recorte,
             'evaluacion': evaluation
         }
+        if analysis.prosodia is not None:
+            result['prosodia'] = analysis.prosodia
+        return result
+
+    def _cache_key(self, analysis: "AudioAnalysis", text: str, model: str, strategy: AudioEvaluationStrategy) -> str:
+        # Con prosodia el prompt cambia: no se mezcla con evaluaciones sin ella.
+        version = strategy.rubric_version() + ("+prosodia" if analysis.prosodia is not None else "")
+        return EvaluationCache.key(analysis.fingerprint, text.strip(), model.lower(), version)
+
+    async def _upload_cache_key(self, audio: bytes | BinaryIO, text: str, model: str,
+                                strategy: AudioEvaluationStrategy) -> str:
+        """Clave por el contenido subido tal cual; se calcula sin decodificar."""
+        digest = await asyncio.to_thread(self._content_hash, audio)
+        version = strategy.rubric_version() + ("+prosodia" if self.prosody else "")
+        return EvaluationCache.key("subido", digest, text.strip(), model.lower(), version)
+
+    @staticmethod
+    def _content_hash(audio: bytes | BinaryIO) -> str:
+        if isinstance(audio, (bytes, bytearray)):
+            return hashlib.sha256(audio).hexdigest()
+        audio.seek(0)
+        digest = hashlib.file_digest(audio, "sha256")
+        audio.seek(0)
+        return digest.hexdigest()
+
+    async def start(self) -> None:
+        await self.dsp.start()
+
+    def close(self) -> None:
+        self.dsp.shutdown()
+
+    def stats(self) -> dict:
+        stats = {'cache': self.cache.stats(), 'coalescencia': self.inflight.stats(), 'dsp': self.dsp.stats()}
+        if self.text_audio is not None:
+            stats['transcripcion'] = self.text_audio.transcription.stats()
+        return stats
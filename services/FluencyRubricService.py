@@ -0,0 +1,25 @@
+import math
+
+
+class FluencyRubricService:
+    """
+    Criterio 5 de la rúbrica (Fluidez Lectora), calculado localmente: es una
+    función pura de las palabras por minuto, con bandas fijas. Las WPM se
+    redondean siempre hacia arriba desde .5 (70.5 => 71), no al par.
+    """
+
+    # (WPM máximas de la banda, nivel, etapa)
+    BANDS = (
+        (49, "Inicial", "Etapa fonológica"),
+        (70, "En proceso", "Etapa ortográfica"),
+        (90, "Logrado", "Etapa de Transición hacia Expresiva"),
+    )
+    TOP = ("Avanzado", "Etapa Expresiva Consolidada")
+
+    def evaluate(self, wpm: float) -> dict:
+        """Retorna {'nivel', 'comentario'} con el mismo formato que el modelo."""
+        rounded = math.floor(wpm + 0.5)
+        nivel, etapa = next(
+            ((nivel, etapa) for limit, nivel, etapa in self.BANDS if rounded <= limit), self.TOP
+        )
+        return {"nivel": nivel, "comentario": f"{rounded} palabras por minuto => {etapa}."}
@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import sqlite3
+import tempfile
+import threading
+from typing import BinaryIO
+from .strategies import EvaluationStrategyFactory
+
+logger = logging.getLogger(__name__)
+
+PENDIENTE = "pendiente"
+EN_PROCESO = "en_proceso"
+COMPLETADO = "completado"
+FALLIDO = "fallido"
+
+
+class JobQueueFullError(Exception):
+    """La cola de trabajos alcanzó JOB_MAX_PENDING trabajos o JOB_MAX_PENDING_MB de audio."""
+
+
+class JobService:
+    """
+    Evaluaciones asincrónicas: submit() encola y retorna un id al instante,
+    JOB_WORKERS workers procesan la cola y get() consulta el estado (con
+    long-poll opcional). Con JOB_DB_PATH los trabajos se persisten en SQLite
+    y los pendientes se reencolan al reiniciar.
+
+    El audio de cada trabajo pendiente queda en su archivo temporal
+    "spooled" (a disco si es grande), no en memoria, y la cola se acota por
+    cantidad y por bytes. SQLite se escribe fuera del event loop y el audio
+    se copia por bloques (blob incremental), sin cargarlo entero.
+    """
+
+    BLOB_CHUNK = 1024 * 1024
+
+    def __init__(self, evaluation_service, workers: int | None = None, db_path: str | None = None):
+        self.evaluation_service = evaluation_service
+        self.workers = workers or int(os.getenv("JOB_WORKERS", "4"))
+        self.max_pending = int(os.getenv("JOB_MAX_PENDING", "1000"))
+        self.max_pending_bytes = int(float(os.getenv("JOB_MAX_PENDING_MB", "2048")) * 1024 * 1024)
+        self.ttl = float(os.getenv("JOB_TTL_SECONDS", "3600"))
+        self._jobs: dict[str, dict] = {}
+        self._payloads: dict[str, tuple[str, BinaryIO, str, int]] = {}
+        self.pending_bytes = 0
+        self._events: dict[str, asyncio.Event] = {}
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+
+        db_path = db_path or os.getenv("JOB_DB_PATH")
+        self._db = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, estado TEXT, modelo TEXT, texto TEXT, audio BLOB, "
+                "resultado TEXT, error TEXT, actualizado REAL)"
+            )
+            self._db.commit()
+
+    async def start(self) -> None:
+        """Levanta los workers y reencola los trabajos persistidos sin terminar."""
+        self._queue = asyncio.Queue()
+        if self._db is not None:
+            for job_id in await asyncio.to_thread(self._restore):
+                self._events[job_id] = asyncio.Event()
+                self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for _, audio, _, _ in self._payloads.values():
+            audio.close()
+
+    async def submit(self, text: str, audio: BinaryIO, model: str) -> dict:
+        """
+        Encola la evaluación. Si la acepta, el trabajo pasa a ser dueño del
+        archivo de audio y lo cierra al terminar; si no, sigue siendo del llamador.
+        """
+        EvaluationStrategyFactory.create(model)  # valida el modelo antes de encolar
+        self._prune()
+        audio.seek(0, os.SEEK_END)
+        size = audio.tell()
+        audio.seek(0)
+        if len(self._payloads) >= self.max_pending or self.pending_bytes + size > self.max_pending_bytes:
+            raise JobQueueFullError("Hay demasiados trabajos pendientes, reintentá más tarde.")
+
+        job_id = uuid.uuid4().hex
+        self._jobs[job_id] = {"id": job_id, "estado": PENDIENTE, "modelo": model, "resultado": None, "error": None}
+        self._payloads[job_id] = (text, audio, model, size)
+        self.pending_bytes += size
+        self._events[job_id] = asyncio.Event()
+        # Se encola recién después de guardarlo: nadie más lee el archivo mientras tanto.
+        try:
+            await self._persist(job_id, text=text, audio=audio)
+        except BaseException:
+            del self._jobs[job_id], self._payloads[job_id], self._events[job_id]
+            self.pending_bytes -= size
+            raise
+        self._queue.put_nowait(job_id)
+        return self._public(job_id)
+
+    async def get(self, job_id: str, wait: float = 0) -> dict | None:
+        """Retorna el trabajo; con wait > 0 espera hasta que termine o venza el plazo."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        event = self._events.get(job_id)
+        if wait > 0 and event is not None and not event.is_set():
+            try:
+                await asyncio.wait_for(event.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+        return self._public(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        text, audio, model, size = self._payloads[job_id]
+        job = self._jobs[job_id]
+        job["estado"] = EN_PROCESO
+        await self._persist(job_id)
+        try:
+            job["resultado"] = await self.evaluation_service.evaluate(text, audio, model)
+            job["estado"] = COMPLETADO
+        except Exception as e:
+            logger.exception("Falló el trabajo %s", job_id)
+            job["error"] = str(e)
+            job["estado"] = FALLIDO
+        job["actualizado"] = time.time()
+        del self._payloads[job_id]
+        self.pending_bytes -= size
+        audio.close()
+        await self._persist(job_id, audio=None)
+        self._events.pop(job_id).set()
+
+    def _public(self, job_id: str) -> dict:
+        job = self._jobs[job_id]
+        return {k: job[k] for k in ("id", "estado", "modelo", "resultado", "error")}
+
+    def _prune(self) -> None:
+        """Descarta de memoria los trabajos terminados hace más de JOB_TTL_SECONDS."""
+        limit = time.time() - self.ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["estado"] in (COMPLETADO, FALLIDO) and job.get("actualizado", 0) < limit
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def _persist(self, job_id: str, **fields) -> None:
+        if self._db is None:
+            return
+        job = self._jobs[job_id]
+        # Se copian los valores ahora: el trabajo puede cambiar mientras escribe el hilo.
+        row = (job_id, job["estado"], job["modelo"], fields.get("text"),
+               json.dumps(job["resultado"], ensure_ascii=False) if job["resultado"] is not None else None,
+               job["error"])
+        await asyncio.to_thread(self._write, row, fields)
+
+    def _write(self, row: tuple, fields: dict) -> None:
+        job_id, estado, modelo, texto, resultado, error = row
+        audio = fields.get("audio")
+        size = None
+        if audio is not None:
+            audio.seek(0, os.SEEK_END)
+            size = audio.tell()
+        with self._db_lock:
+            # El audio se reserva con zeroblob y se copia por bloques.
+            self._db.execute(
+                "INSERT INTO jobs (id, estado, modelo, texto, audio, resultado, error, actualizado) "
+                "VALUES (?, ?, ?, ?, " + ("zeroblob(?)" if size is not None else "NULL") + ", ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET estado = excluded.estado, resultado = excluded.resultado, "
+                "error = excluded.error, actualizado = excluded.actualizado"
+                + (", audio = excluded.audio" if "audio" in fields else ""),
+                (job_id, estado, modelo, texto, *(() if size is None else (size,)), resultado, error, time.time()),
+            )
+            if size:
+                (rowid,) = self._db.execute("SELECT rowid FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                audio.seek(0)
+                with self._db.blobopen("jobs", "audio", rowid) as blob:
+                    while chunk := audio.read(self.BLOB_CHUNK):
+                        blob.write(chunk)
+                audio.seek(0)
+            self._db.execute("DELETE FROM jobs WHERE estado IN (?, ?) AND actualizado < ?",
+                             (COMPLETADO, FALLIDO, time.time() - self.ttl))
+            self._db.commit()
+
+    def _restore(self) -> list[str]:
+        """Carga los trabajos persistidos; retorna los pendientes, a reencolar."""
+        pending = []
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT rowid, id, estado, modelo, texto, audio IS NOT NULL, resultado, error, actualizado FROM jobs"
+            ).fetchall()
+            for rowid, job_id, estado, modelo, texto, has_audio, resultado, error, actualizado in rows:
+                if estado in (PENDIENTE, EN_PROCESO) and not has_audio:
+                    estado, error = FALLIDO, "El trabajo se perdió al reiniciar."
+                self._jobs[job_id] = {
+                    "id": job_id, "estado": estado, "modelo": modelo,
+                    "resultado": json.loads(resultado) if resultado else None,
+                    "error": error, "actualizado": actualizado,
+                }
+                if estado in (PENDIENTE, EN_PROCESO):
+                    self._jobs[job_id]["estado"] = PENDIENTE
+                    audio = tempfile.SpooledTemporaryFile(max_size=self.evaluation_service.uploads.spool_bytes)
+                    with self._db.blobopen("jobs", "audio", rowid, readonly=True) as blob:
+                        while chunk := blob.read(self.BLOB_CHUNK):
+                            audio.write(chunk)
+                    size = audio.tell()
+                    audio.seek(0)
+                    self._payloads[job_id] = (texto, audio, modelo, size)
+                    self.pending_bytes += size
+                    pending.append(job_id)
+        logger.info("Trabajos restaurados: %d pendientes", len(pending))
+        return pending
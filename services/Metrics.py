@@ -0,0 +1,129 @@
+import os
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+_NULL = nullcontext()
+_timings: ContextVar[list | None] = ContextVar("server_timings", default=None)
+_collecting: ContextVar[bool] = ContextVar("collecting_timings", default=False)
+
+
+class Metrics:
+    """
+    Métricas en proceso (contadores e histogramas) exportadas en formato
+    Prometheus por /metrics. Con METRICS_ENABLED=false las llamadas no hacen
+    nada. Con SERVER_TIMING=true las duraciones de cada etapa se devuelven
+    además en el header Server-Timing de la respuesta.
+    """
+
+    PREFIX = "lectura_"
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    BYTES_BUCKETS = (16e3, 64e3, 256e3, 1e6, 4e6, 16e6, 64e6)
+
+    enabled = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    server_timing = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+    _counters: dict[tuple, float] = {}
+    _histograms: dict[tuple, list] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def inc(cls, name: str, value: float = 1, **labels) -> None:
+        if not cls.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with cls._lock:
+            cls._counters[key] = cls._counters.get(key, 0) + value
+
+    @classmethod
+    def observe(cls, name: str, value: float, buckets: tuple = BUCKETS, **labels) -> None:
+        if not cls.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with cls._lock:
+            histogram = cls._histograms.get(key)
+            if histogram is None:
+                # [buckets, conteos por bucket (+Inf al final), suma, cantidad]
+                histogram = cls._histograms[key] = [buckets, [0] * (len(buckets) + 1), 0.0, 0]
+            histogram[1][bisect_left(buckets, value)] += 1
+            histogram[2] += value
+            histogram[3] += 1
+
+    @classmethod
+    def stage(cls, name: str, **labels):
+        """Context manager que mide la duración de una etapa del pipeline."""
+        if not cls.enabled and _timings.get() is None:
+            return _NULL
+        return cls._timed_stage(name, labels)
+
+    @classmethod
+    @contextmanager
+    def _timed_stage(cls, name: str, labels: dict):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.record_stage(name, time.perf_counter() - start, **labels)
+
+    @classmethod
+    def record_stage(cls, name: str, seconds: float, **labels) -> None:
+        """Registra una duración medida en otro lado (p. ej. en un worker)."""
+        if not _collecting.get():
+            cls.observe("etapa_segundos", seconds, etapa=name, **labels)
+        timings = _timings.get()
+        if timings is not None:
+            timings.append((name, seconds))
+
+    @classmethod
+    @contextmanager
+    def collect(cls):
+        """
+        Junta las duraciones de etapas en una lista sin registrarlas; se usa en
+        los workers DSP, cuyo proceso no exporta métricas. El proceso
+        principal las registra luego con record_stage.
+        """
+        timings = []
+        token, collecting = _timings.set(timings), _collecting.set(True)
+        try:
+            yield timings
+        finally:
+            _timings.reset(token)
+            _collecting.reset(collecting)
+
+    @classmethod
+    def start_request(cls) -> list | None:
+        """Activa la captura de Server-Timing para la request en curso."""
+        if not cls.server_timing:
+            return None
+        timings = []
+        _timings.set(timings)
+        return timings
+
+    @staticmethod
+    def server_timing_header(timings: list) -> str:
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings)
+
+    @classmethod
+    def render(cls) -> str:
+        """Exposición en formato de texto de Prometheus."""
+        lines = []
+        with cls._lock:
+            for (name, labels), value in sorted(cls._counters.items()):
+                lines.append(f"{cls.PREFIX}{name}{cls._labels(labels)} {value:g}")
+            for (name, labels), (buckets, counts, total, count) in sorted(cls._histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip((*buckets, "+Inf"), counts):
+                    cumulative += bucket_count
+                    le = bound if bound == "+Inf" else f"{bound:g}"
+                    lines.append(f"{cls.PREFIX}{name}_bucket{cls._labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{cls.PREFIX}{name}_sum{cls._labels(labels)} {total:g}")
+                lines.append(f"{cls.PREFIX}{name}_count{cls._labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _labels(labels: tuple) -> str:
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
@@ -1,29 +1,67 @@
-import io
-import librosa
-import noisereduce as nr
-import soundfile as sf
+import os
+from typing import Iterator
+import numpy as np
+from .DecodedAudio import DecodedAudio
 
 class NoiseReduceService:
-    @staticmethod
-    def reducir_ruido(audio_bytes: bytes) -> bytes:
-        """
-        Reduce noise from the given audio bytes.
+    """
+    Reducción de ruido con noisereduce (compuerta espectral no estacionaria,
+    la de nr.reduce_noise por defecto), aplicada por bloques.
+
+    noisereduce ya procesa internamente en bloques de chunk_size muestras
+    con padding muestras de ceros/contexto a cada lado, pero arma toda la
+    salida (en un memmap) antes de retornar. Acá se recorre la misma grilla
+    de bloques y cada uno se emite apenas está listo, así la memoria extra
+    queda acotada a un bloque. Con los valores por defecto de
+    NOISE_BLOCK_SAMPLES y NOISE_PADDING_SAMPLES (los de noisereduce) el
+    resultado es idéntico a una sola llamada sobre todo el audio; bloques
+    más chicos usan menos memoria a costa de diferencias en los bordes.
+    """
 
-        :param audio_bytes: Audio data in bytes.
-        :return: Audio data with reduced noise in bytes.
+    def __init__(self):
+        self.block_samples = int(os.getenv("NOISE_BLOCK_SAMPLES", "600000"))
+        self.padding_samples = int(os.getenv("NOISE_PADDING_SAMPLES", "30000"))
+        self.prop_decrease = float(os.getenv("NOISE_PROP_DECREASE", "1.0"))
+
+    def reducir_ruido(self, audio: DecodedAudio | bytes) -> DecodedAudio:
         """
-        # Load the audio
-        y, sr = librosa.load(io.BytesIO(audio_bytes), sr=None)
+        Reduce noise from the given audio.
 
-        # Assume the first second is noise
-        noise_sample = y[:sr]
+        :param audio: Decoded audio (or raw audio bytes).
+        :return: Decoded audio with reduced noise.
+        """
+        audio = DecodedAudio.of(audio)
+        output = np.empty(audio.samples.shape[0], dtype=np.int16)
+        position = 0
+        for block in self.stream(audio):
+            output[position:position + len(block)] = np.clip(block, -1.0, 1.0) * 32767
+            position += len(block)
+        return DecodedAudio.from_array(output, audio.sample_rate)
 
-        # Apply noise reduction
-        reduced_noise = nr.reduce_noise(y=y, sr=sr, y_noise=noise_sample)
+    def stream(self, audio: DecodedAudio | bytes, block_samples: int | None = None) -> Iterator[np.ndarray]:
+        """Genera bloques consecutivos de la señal mono (float32) sin ruido."""
+        import noisereduce as nr
 
-        # Save back to bytes
-        out_io = io.BytesIO()
-        sf.write(out_io, reduced_noise, sr, format='WAV')
-        out_io.seek(0)
+        audio = DecodedAudio.of(audio)
+        sr, total = audio.sample_rate, audio.samples.shape[0]
+        block = block_samples or self.block_samples
+        padding = self.padding_samples
+        for start in range(0, total, block):
+            end = min(start + block, total)
+            # Como noisereduce: si hay más de un bloque, el último también se
+            # procesa con el largo completo (rellenado con ceros).
+            padded_end = end if total <= block else start + block
+            segment = self._mono(audio, start - padding, padded_end + padding)
+            cleaned = nr.reduce_noise(
+                y=segment, sr=sr, prop_decrease=self.prop_decrease, chunk_size=None, padding=0
+            )
+            yield cleaned[padding:padding + end - start]
 
-        return out_io.read()
+    @staticmethod
+    def _mono(audio: DecodedAudio, start: int, end: int) -> np.ndarray:
+        """Muestras [start, end) en float32 mono (como as_float), con ceros fuera de la señal."""
+        total = audio.samples.shape[0]
+        chunk = audio.samples[max(0, start):min(end, total)]
+        mono = chunk.mean(axis=1, dtype=np.float32) if audio.channels > 1 else chunk[:, 0].astype(np.float32)
+        mono /= float(1 << (8 * audio.sample_width - 1))
+        return np.pad(mono, (max(0, -start), max(0, end - total)))
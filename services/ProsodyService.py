@@ -0,0 +1,143 @@
+import os
+import re
+import numpy as np
+from .Metrics import Metrics
+
+_VOWEL_GROUPS = re.compile(r"[aeiouáéíóúü]+", re.IGNORECASE)
+_PUNCTUATION = re.compile(r"[.,;:!?…»)\"]+$")
+
+
+class ProsodyService:
+    """
+    Rasgos prosódicos locales (tono, intensidad, pausas) en una sola pasada
+    vectorizada sobre las pistas de tono e intensidad (cada 10 ms).
+    Con parselmouth instalado (dependencia opcional) las pistas salen de
+    Praat; si no, de una autocorrelación por frames con numpy.
+
+    Las pausas se buscan en los límites de puntuación del texto: cada límite
+    se ubica en el tiempo de habla en proporción a las sílabas leídas hasta
+    esa palabra, y cuenta como respetado si hay una pausa a menos de
+    PROSODY_PUNCT_TOLERANCE_S segundos de habla.
+    """
+
+    TIME_STEP = 0.01
+    PITCH_FLOOR = 75.0
+    PITCH_CEILING = 500.0
+    VOICING_THRESHOLD = 0.45
+    SILENCE_THRESHOLD = 0.03
+
+    def __init__(self):
+        self.min_pause_s = float(os.getenv("PROSODY_MIN_PAUSE_MS", "250")) / 1000
+        self.silence_db = float(os.getenv("PROSODY_SILENCE_DB", "25"))
+        self.punct_tolerance_s = float(os.getenv("PROSODY_PUNCT_TOLERANCE_S", "0.6"))
+
+    def analyze(self, samples: np.ndarray, sample_rate: int, text: str) -> dict | None:
+        """
+        Resumen numérico compacto; None si el audio no tiene habla.
+        samples es la señal mono en float [-1, 1], p. ej. la versión de habla
+        que el pipeline ya remuestreó para el modelo (acá no se remuestrea).
+        """
+        with Metrics.stage("prosodia"):
+            f0, intensity = self._tracks(samples, sample_rate)
+            return self._features(f0, intensity, text)
+
+    # Pistas
+
+    def _tracks(self, y: np.ndarray, sr: int) -> tuple[np.ndarray, np.ndarray]:
+        """(f0 en Hz con NaN si no hay voz, intensidad en dB) cada TIME_STEP segundos."""
+        try:
+            import parselmouth
+        except ImportError:
+            return self._numpy_tracks(y, sr)
+
+        sound = parselmouth.Sound(y.astype(np.float64), sampling_frequency=sr)
+        pitch = sound.to_pitch(time_step=self.TIME_STEP, pitch_floor=self.PITCH_FLOOR, pitch_ceiling=self.PITCH_CEILING)
+        intensity = sound.to_intensity(minimum_pitch=self.PITCH_FLOOR, time_step=self.TIME_STEP)
+        f0 = pitch.selected_array["frequency"]
+        f0 = np.where(f0 > 0, f0, np.nan)
+        db = np.interp(pitch.xs(), intensity.xs(), intensity.values[0])
+        return f0, db
+
+    def _numpy_tracks(self, y: np.ndarray, sr: int, block_frames: int = 2048) -> tuple[np.ndarray, np.ndarray]:
+        """Autocorrelación normalizada por frames (como Praat), en bloques de frames."""
+        hop = int(sr * self.TIME_STEP)
+        size = int(sr * 3 / self.PITCH_FLOOR)  # tres períodos del tono más grave
+        if len(y) < size:
+            return np.full(0, np.nan), np.full(0, -np.inf)
+        frames = np.lib.stride_tricks.sliding_window_view(y, size)[::hop]
+        n_fft = 1 << (2 * size - 1).bit_length()
+        min_lag, max_lag = int(sr / self.PITCH_CEILING), int(sr / self.PITCH_FLOOR)
+        window = np.hanning(size).astype(np.float32)
+        window_ac = np.fft.irfft(np.abs(np.fft.rfft(window, n_fft)) ** 2)[:max_lag + 1]
+        global_peak = np.abs(y).max() or 1.0
+
+        f0 = np.full(len(frames), np.nan)
+        db = np.empty(len(frames))
+        for start in range(0, len(frames), block_frames):
+            block = frames[start:start + block_frames]
+            centered = block - block.mean(axis=1, keepdims=True)
+            rms = np.sqrt(np.mean(block ** 2, axis=1))
+            db[start:start + len(block)] = 20 * np.log10(np.maximum(rms, 1e-10) / 2e-5)
+
+            spectrum = np.fft.rfft(centered * window, n_fft, axis=1)
+            ac = np.fft.irfft(np.abs(spectrum) ** 2, n_fft, axis=1)[:, :max_lag + 1]
+            ac = ac / np.maximum(ac[:, :1], 1e-12) / (window_ac / window_ac[0])
+            # Primer máximo local cercano al más alto: evita errores de octava
+            # (los múltiplos del período tienen casi la misma correlación).
+            candidates = ac[:, min_lag - 1:]
+            middle = candidates[:, 1:-1]
+            peaks = (middle > candidates[:, :-2]) & (middle >= candidates[:, 2:])
+            peaks &= middle >= 0.9 * np.where(peaks, middle, -np.inf).max(axis=1, keepdims=True)
+            lags = min_lag + np.argmax(peaks, axis=1)
+            strength = np.where(peaks.any(axis=1), ac[np.arange(len(block)), lags], 0.0)
+            voiced = (strength > self.VOICING_THRESHOLD) & (np.abs(block).max(axis=1) > self.SILENCE_THRESHOLD * global_peak)
+            f0[start:start + len(block)][voiced] = sr / lags[voiced]
+        return f0, db
+
+    # Rasgos
+
+    def _features(self, f0: np.ndarray, db: np.ndarray, text: str) -> dict | None:
+        if not np.any(np.isfinite(db)) or not np.any(np.isfinite(f0)):
+            return None
+        step = self.TIME_STEP
+
+        # Pausa: sin voz y con intensidad SILENCE_DB por debajo del máximo.
+        silent = np.isnan(f0) & (db < np.nanmax(db) - self.silence_db)
+        starts, ends = self._runs(silent)
+        inner = (starts > 0) & (ends < len(silent))  # fuera los silencios de los extremos
+        long_enough = (ends - starts) * step >= self.min_pause_s
+        starts, ends = starts[inner & long_enough], ends[inner & long_enough]
+
+        # Tiempo de habla acumulado (sin pausas ni extremos) en cada frame.
+        speaking = ~silent
+        speech_time = np.cumsum(speaking) * step
+        total_speech = speech_time[-1]
+
+        words = text.split()
+        syllables = np.array([max(1, len(_VOWEL_GROUPS.findall(word))) for word in words] or [0])
+        boundaries = np.array([i for i, word in enumerate(words[:-1]) if _PUNCTUATION.search(word)], dtype=int)
+        boundary_time = np.cumsum(syllables)[boundaries] / syllables.sum() * total_speech if len(boundaries) else np.empty(0)
+        pause_time = speech_time[starts]
+        near = np.abs(pause_time[:, None] - boundary_time[None, :]) <= self.punct_tolerance_s
+
+        voiced_f0 = f0[np.isfinite(f0)]
+        semitones = 12 * np.log2(voiced_f0 / np.median(voiced_f0))
+        pauses = (ends - starts) * step
+        return {
+            "pausas": int(len(starts)),
+            "pausa_media_s": round(float(pauses.mean()), 2) if len(pauses) else 0.0,
+            "puntuaciones": int(len(boundaries)),
+            "pausas_en_puntuacion": int(near.any(axis=0).sum()),
+            "pausas_fuera_de_puntuacion": int((~near.any(axis=1)).sum()),
+            "tono_medio_hz": round(float(voiced_f0.mean()), 1),
+            "variacion_tono_st": round(float(semitones.std()), 2),
+            "rango_tono_st": round(float(np.percentile(semitones, 95) - np.percentile(semitones, 5)), 2),
+            "intensidad_media_db": round(float(db[speaking].mean()), 1),
+            "silabas_por_segundo": round(float(syllables.sum() / total_speech), 2) if total_speech else 0.0,
+        }
+
+    @staticmethod
+    def _runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Inicios y fines (exclusivos) de las corridas de True."""
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
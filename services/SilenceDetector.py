@@ -0,0 +1,67 @@
+import numpy as np
+
+
+class SilenceDetector:
+    """
+    Detección de silencios vectorizada sobre PCM crudo.
+    Reproduce la semántica de pydub.silence.detect_silence (ventana de
+    min_silence_len ms que avanza de a 1 ms, RMS entero comparado contra
+    silence_thresh en dBFS) sin iterar en Python sobre cada milisegundo.
+    """
+
+    @staticmethod
+    def detect_silence(
+        samples: np.ndarray,
+        sample_rate: int,
+        sample_width: int,
+        min_silence_len: int = 1000,
+        silence_thresh: float = -16,
+    ) -> list[list[int]]:
+        """
+        Retorna los rangos silenciosos [inicio_ms, fin_ms].
+
+        :param samples: PCM entero con forma (frames,) o (frames, canales).
+        :param sample_rate: Frecuencia de muestreo en Hz.
+        :param sample_width: Bytes por muestra (define la amplitud máxima).
+        """
+        frames = samples.shape[0]
+        channels = samples.shape[1] if samples.ndim > 1 else 1
+        seg_len = round(1000 * (frames / sample_rate))
+        if seg_len < min_silence_len:
+            return []
+
+        max_amplitude = float(1 << (8 * sample_width - 1))
+        threshold = 10 ** (silence_thresh / 20) * max_amplitude
+
+        # Energía acumulada por frame (sumando canales). Con 8/16 bits la suma
+        # entra exacta en int64; con 32 bits se usa float64.
+        dtype = np.float64 if sample_width > 2 else np.int64
+        energy = np.square(samples, dtype=dtype)
+        if energy.ndim > 1:
+            energy = energy.sum(axis=1)
+        cumulative = np.zeros(frames + 1, dtype=dtype)
+        np.cumsum(energy, out=cumulative[1:])
+        del energy
+
+        # Mismo redondeo de posiciones que AudioSegment.__getitem__; las
+        # ventanas que exceden el final se rellenan con ceros, que cuentan
+        # para el promedio pero no para la energía.
+        frames_per_ms = sample_rate / 1000.0
+        starts_ms = np.arange(seg_len - min_silence_len + 1)
+        start_frames = (starts_ms * frames_per_ms).astype(np.int64)
+        end_frames = ((starts_ms + min_silence_len) * frames_per_ms).astype(np.int64)
+        window_sum = cumulative[np.minimum(end_frames, frames)] - cumulative[np.minimum(start_frames, frames)]
+        window_len = (end_frames - start_frames) * channels
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rms = np.floor(np.sqrt(window_sum / window_len))
+        rms[window_len == 0] = 0
+        silence_starts = np.flatnonzero(rms <= threshold)
+        if silence_starts.size == 0:
+            return []
+
+        # Agrupa inicios contiguos: un hueco mayor a min_silence_len corta el rango.
+        breaks = np.flatnonzero(np.diff(silence_starts) > min_silence_len)
+        range_starts = silence_starts[np.concatenate(([0], breaks + 1))]
+        range_ends = silence_starts[np.concatenate((breaks, [silence_starts.size - 1]))] + min_silence_len
+        return [[int(start), int(end)] for start, end in zip(range_starts, range_ends)]
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+from .Metrics import Metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce llamadas concurrentes con la misma clave: la primera ejecuta la
+    corrutina y las demás esperan y comparten su resultado (o su error).
+    Si todos los que esperaban se cancelan, la llamada compartida también.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+            Metrics.inc("coalescidas_total")
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # shield: si un cliente cancela, la llamada sigue para los demás.
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1:
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def stats(self) -> dict:
+        return {"en_vuelo": len(self._inflight), "llamadas": self.calls, "coalescidas": self.coalesced}
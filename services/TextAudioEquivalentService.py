@@ -1,14 +1,16 @@
 import re
-import io
-import tempfile
 import os
-import openai
-from fastapi import UploadFile
-from difflib import SequenceMatcher
+from typing import BinaryIO
+from .WordAligner import WordAligner, Alignment
+from .TranscriptionService import TranscriptionService
 
 class TextAudioEquivalentService:
-    def __init__(self, threshold: float = 0.45):
+    def __init__(self, threshold: float = 0.45, transcription: TranscriptionService | None = None):
         self.threshold = threshold
+        self.transcription = transcription or TranscriptionService()
+        self.aligner = WordAligner()
+        # Por encima de estas ediciones se informa sólo la similaridad.
+        self.max_edits = int(os.getenv("ALIGN_MAX_EDITS", "1000"))
 
     def clean_text(self, text: str) -> str:
         text = text.lower()
@@ -17,26 +19,22 @@ class TextAudioEquivalentService:
         return text.strip()
 
     def similarity(self, a: str, b: str) -> float:
-        return SequenceMatcher(None, a, b).ratio()
+        return self.align(a, b).similaridad
 
-    async def verify(self, audio_bytes: bytes, provided_text: str):
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-            tmp.write(audio_bytes)
-            tmp_path = tmp.name
-        try:
-            with open(tmp_path, "rb") as f:
-                transcription = openai.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=f
-                )
-            transcript = transcription.text
-            cleaned_transcript = self.clean_text(transcript)
-            cleaned_provided = self.clean_text(provided_text)
-            sim = self.similarity(cleaned_transcript, cleaned_provided)
-            match = sim >= self.threshold
-            return {"match": match, "similaridad": sim, "transcripcion": transcript}
-        finally:
-            try:
-                os.unlink(tmp_path)
-            except OSError:
-                pass
\ No newline at end of file
+    def align(self, provided: str, transcript: str) -> Alignment:
+        """Alineación por palabras de dos textos ya limpios."""
+        return self.aligner.align(provided.split(), transcript.split(), self.max_edits)
+
+    async def verify(self, audio: bytes | BinaryIO, provided_text: str):
+        """Compara el texto con la transcripción del audio original (tal como se subió)."""
+        transcript = await self.transcription.transcribe(audio)
+        cleaned_transcript = self.clean_text(transcript)
+        cleaned_provided = self.clean_text(provided_text)
+        alignment = self.align(cleaned_provided, cleaned_transcript)
+        match = alignment.similaridad >= self.threshold
+        return {
+            "match": match,
+            "similaridad": alignment.similaridad,
+            "transcripcion": transcript,
+            "diferencias": alignment.diferencias,
+        }
\ No newline at end of file
@@ -0,0 +1,141 @@
+import os
+import asyncio
+import hashlib
+from typing import BinaryIO
+from .EvaluationCache import EvaluationCache
+from .SingleFlight import SingleFlight
+from .Metrics import Metrics
+
+
+def _filename(data: bytes) -> str:
+    """Nombre con la extensión del contenedor: la API detecta el formato por ahí."""
+    if data[:4] == b"RIFF":
+        return "audio.wav"
+    if data[:4] == b"fLaC":
+        return "audio.flac"
+    if data[:4] == b"OggS":
+        return "audio.ogg"
+    if data[:4] == b"\x1a\x45\xdf\xa3":
+        return "audio.webm"
+    if data[4:8] == b"ftyp":
+        return "audio.m4a"
+    return "audio.mp3"
+
+
+class OpenAITranscriber:
+    """Whisper por la API de OpenAI; el audio se envía desde memoria."""
+
+    NAME = "openai"
+    LABEL = "Whisper"
+
+    def __init__(self):
+        self.model = os.getenv("TRANSCRIPTION_MODEL", "whisper-1")
+        self._limiter = asyncio.Semaphore(max(1, int(os.getenv("TRANSCRIPTION_MAX_CONCURRENCY", "8"))))
+
+    async def transcribe(self, data: bytes) -> str:
+        from .strategies import ClientRegistry
+        from .strategies.ProviderGuard import ProviderGuard
+
+        async def request():
+            transcription = await ClientRegistry.openai().audio.transcriptions.create(
+                model=self.model,
+                file=(_filename(data), data),
+            )
+            return transcription.text
+
+        return await ProviderGuard.get("openai").call(request, self.LABEL, self._limiter)
+
+
+class LocalTranscriber:
+    """
+    Whisper local con faster-whisper (dependencia opcional), para no
+    depender de la red. El modelo se carga en el primer uso.
+    """
+
+    NAME = "local"
+
+    def __init__(self):
+        self.model = os.getenv("TRANSCRIPTION_MODEL", "small")
+        self._model = None
+
+    def _load(self):
+        if self._model is None:
+            from faster_whisper import WhisperModel
+
+            self._model = WhisperModel(self.model, compute_type="int8")
+        return self._model
+
+    def _run(self, data: bytes) -> str:
+        import io
+
+        segments, _ = self._load().transcribe(io.BytesIO(data), language="es")
+        return " ".join(segment.text.strip() for segment in segments)
+
+    async def transcribe(self, data: bytes) -> str:
+        return await asyncio.to_thread(self._run, data)
+
+
+class FakeTranscriber:
+    """Transcriptor fijo para pruebas y benchmarks: retorna TRANSCRIPTION_FAKE_TEXT."""
+
+    NAME = "fake"
+
+    def __init__(self, text: str | None = None):
+        self.text = text if text is not None else os.getenv("TRANSCRIPTION_FAKE_TEXT", "")
+        self.calls = 0
+
+    async def transcribe(self, data: bytes) -> str:
+        self.calls += 1
+        return self.text
+
+
+class TranscriptionService:
+    """
+    Transcribe audios con el backend de TRANSCRIBER ('openai', 'local' o
+    'fake') y guarda las transcripciones por hash del contenido, así el mismo
+    audio no se vuelve a transcribir: ni en requests concurrentes (se
+    coalescen) ni en posteriores (cache en memoria y, con CACHE_DB_PATH, en
+    disco). Cualquier etapa puede reutilizarlas con transcribe().
+    """
+
+    BACKENDS = {
+        OpenAITranscriber.NAME: OpenAITranscriber,
+        LocalTranscriber.NAME: LocalTranscriber,
+        FakeTranscriber.NAME: FakeTranscriber,
+    }
+
+    def __init__(self, backend=None, cache: EvaluationCache | None = None):
+        if backend is None:
+            name = os.getenv("TRANSCRIBER", OpenAITranscriber.NAME).lower()
+            if name not in self.BACKENDS:
+                raise ValueError(f"Transcriptor '{name}' no soportado. Opciones: {', '.join(self.BACKENDS)}")
+            backend = self.BACKENDS[name]()
+        self.backend = backend
+        self.cache = cache or EvaluationCache(name="transcripcion")
+        self.inflight = SingleFlight()
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    async def transcribe(self, audio: bytes | BinaryIO) -> str:
+        """Transcripción del audio (bytes o archivo), desde la cache si ya se hizo."""
+        if not isinstance(audio, (bytes, bytearray)):
+            audio.seek(0)
+            audio = audio.read()
+        key = EvaluationCache.key(
+            "transcripcion", self.content_hash(audio), self.backend.NAME, getattr(self.backend, "model", "")
+        )
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached["texto"]
+        return await self.inflight.run(key, lambda: self._transcribe(key, audio))
+
+    def stats(self) -> dict:
+        return {"transcriptor": self.backend.NAME, "cache": self.cache.stats(), "coalescencia": self.inflight.stats()}
+
+    async def _transcribe(self, key: str, audio: bytes) -> str:
+        with Metrics.stage("transcripcion", transcriptor=self.backend.NAME):
+            text = await self.backend.transcribe(audio)
+        self.cache.set(key, {"texto": text})
+        return text
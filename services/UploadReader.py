@@ -0,0 +1,52 @@
+import os
+import tempfile
+from fastapi import UploadFile
+from .Metrics import Metrics
+
+
+class UploadTooLargeError(ValueError):
+    """El archivo subido supera el máximo por archivo (MAX_UPLOAD_MB)."""
+
+
+class UploadReader:
+    """
+    Lee un UploadFile por bloques a un archivo temporal "spooled": queda en
+    memoria hasta UPLOAD_SPOOL_MB y pasa a disco por encima de ese tamaño.
+    Rechaza el archivo apenas supera el máximo, sin terminar de leerlo: por
+    defecto lo que ocupa un WAV sin comprimir de MAX_AUDIO_SECONDS (300),
+    o MAX_UPLOAD_MB si está definido.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+    # Peor caso habitual: WAV PCM de 16 bits, estéreo, 48 kHz.
+    WAV_BYTES_PER_SECOND = 48000 * 2 * 2
+
+    def __init__(self, max_bytes: int | None = None, spool_bytes: int | None = None):
+        self.max_bytes = max_bytes or self.default_max_bytes()
+        self.spool_bytes = spool_bytes or int(float(os.getenv("UPLOAD_SPOOL_MB", "4")) * 1024 * 1024)
+
+    @classmethod
+    def default_max_bytes(cls) -> int:
+        if os.getenv("MAX_UPLOAD_MB"):
+            return int(float(os.getenv("MAX_UPLOAD_MB")) * 1024 * 1024)
+        # Margen de 1 MB para encabezados y metadatos del contenedor.
+        return int(float(os.getenv("MAX_AUDIO_SECONDS", "300")) * cls.WAV_BYTES_PER_SECOND) + cls.CHUNK_SIZE
+
+    async def read(self, upload: UploadFile) -> tempfile.SpooledTemporaryFile:
+        if upload.size is not None and upload.size > self.max_bytes:
+            raise UploadTooLargeError(self._message())
+
+        buffer = tempfile.SpooledTemporaryFile(max_size=self.spool_bytes)
+        total = 0
+        while chunk := await upload.read(self.CHUNK_SIZE):
+            total += len(chunk)
+            if total > self.max_bytes:
+                buffer.close()
+                raise UploadTooLargeError(self._message())
+            buffer.write(chunk)
+        buffer.seek(0)
+        Metrics.observe("audio_bytes", total, Metrics.BYTES_BUCKETS, tipo="upload")
+        return buffer
+
+    def _message(self) -> str:
+        return f"El audio supera el máximo permitido de {self.max_bytes / (1024 * 1024):.3g} MB."
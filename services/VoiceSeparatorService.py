@@ -1,41 +1,137 @@
-import io
-import torchaudio
-from speechbrain.inference.separation import SepformerSeparation
-from speechbrain.utils.fetching import LocalStrategy
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .DecodedAudio import DecodedAudio
 
 class VoiceSeparatorService:
+    """
+    Separa la voz más cercana al micrófono con Sepformer (WHAMR!, 8 kHz).
+    El modelo se carga una sola vez por proceso, en el primer uso, y se
+    comparte entre todas las instancias. La inferencia corre en un pool
+    acotado (VOICE_SEPARATOR_WORKERS) y las grabaciones largas se procesan por
+    bloques de VOICE_SEPARATOR_CHUNK_SECONDS con un solapamiento que se
+    funde linealmente, así la memoria no crece con la duración. En cada
+    bloque se sigue a la misma voz: la fuente más parecida a la elegida en
+    el bloque anterior dentro de la zona solapada.
+    El modelo se descarga en VOICE_SEPARATOR_MODEL_DIR (por defecto, en
+    ~/.cache/audio-cleaner, fuera del repositorio).
+    """
+
+    SAMPLE_RATE = 8000
+
+    _separator = None
+    _load_lock = threading.Lock()
+    _executor: ThreadPoolExecutor | None = None
+
     def __init__(self):
-        self.separator = SepformerSeparation.from_hparams(
-            source="speechbrain/sepformer-whamr",
-            savedir="tmpdir",
-            local_strategy=LocalStrategy.COPY,  # Force copy, no symlink
-            run_opts={"use_symlink": False},    # Backup
-        )
-
-    def separar_voces(self, audio_bytes: bytes) -> bytes:
-        # Save the bytes to a temporary file
-        with open("temp_input.wav", "wb") as f:
-            f.write(audio_bytes)
-
-        # Load audio and resample to 8 kHz if necessary
-        waveform, sample_rate = torchaudio.load("temp_input.wav")
-        if sample_rate != 8000:
-            waveform = torchaudio.functional.resample(waveform, orig_freq=sample_rate, new_freq=8000)
-            sample_rate = 8000
-
-        # Save the resampled waveform
-        torchaudio.save("temp_input_resampled.wav", waveform, sample_rate)
-
-        # Separate audio sources
-        est_sources = self.separator.separate_file(path="temp_input_resampled.wav")
-
-        # Select the source with the highest energy
-        energy_1 = est_sources[:, :, 0].pow(2).mean()
-        energy_2 = est_sources[:, :, 1].pow(2).mean()
-        voz_cercana = est_sources[:, :, 0] if energy_1 > energy_2 else est_sources[:, :, 1]
-
-        # Save the result to a buffer
-        buffer = io.BytesIO()
-        torchaudio.save(buffer, voz_cercana.detach().cpu(), 8000, format='wav')
-        buffer.seek(0)
-        return buffer.read()
\ No newline at end of file
+        self.chunk_seconds = float(os.getenv("VOICE_SEPARATOR_CHUNK_SECONDS", "10"))
+        self.overlap_seconds = float(os.getenv("VOICE_SEPARATOR_OVERLAP_SECONDS", "0.5"))
+
+    @classmethod
+    def model(cls):
+        """Retorna el modelo compartido, descargándolo/cargándolo en el primer uso."""
+        if cls._separator is None:
+            with cls._load_lock:
+                if cls._separator is None:
+                    # torch/speechbrain tardan segundos en importarse: sólo si se usa el servicio.
+                    import torch
+                    from speechbrain.inference.separation import SepformerSeparation
+                    from speechbrain.utils.fetching import LocalStrategy
+
+                    threads = os.getenv("VOICE_SEPARATOR_THREADS")
+                    if threads:
+                        torch.set_num_threads(int(threads))
+                    separator = SepformerSeparation.from_hparams(
+                        source="speechbrain/sepformer-whamr",
+                        savedir=os.getenv(
+                            "VOICE_SEPARATOR_MODEL_DIR",
+                            os.path.join(os.path.expanduser("~"), ".cache", "audio-cleaner", "sepformer-whamr"),
+                        ),
+                        local_strategy=LocalStrategy.COPY,  # Force copy, no symlink
+                        run_opts={"use_symlink": False},    # Backup
+                    )
+                    separator.eval()
+                    cls._separator = separator
+        return cls._separator
+
+    @classmethod
+    def _pool(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            with cls._load_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=int(os.getenv("VOICE_SEPARATOR_WORKERS", "1")),
+                        thread_name_prefix="sepformer",
+                    )
+        return cls._executor
+
+    async def separar_voces_async(self, audio: DecodedAudio | bytes) -> DecodedAudio:
+        """Igual que separar_voces, sin bloquear el event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(), self.separar_voces, audio)
+
+    def separar_voces(self, audio: DecodedAudio | bytes) -> DecodedAudio:
+        import torch
+
+        audio = DecodedAudio.of(audio)
+        separator = self.model()
+
+        # Mono waveform [batch, time], resampled to 8 kHz if necessary
+        waveform = torch.from_numpy(audio.as_float()).unsqueeze(0)
+        if audio.sample_rate != self.SAMPLE_RATE:
+            import torchaudio
+
+            waveform = torchaudio.functional.resample(
+                waveform, orig_freq=audio.sample_rate, new_freq=self.SAMPLE_RATE
+            )
+
+        total = waveform.shape[1]
+        chunk = max(1, int(self.chunk_seconds * self.SAMPLE_RATE))
+        overlap = min(int(self.overlap_seconds * self.SAMPLE_RATE), chunk // 2)
+        output = np.zeros(total, dtype=np.float32)
+
+        with torch.inference_mode():
+            start = 0
+            while start < total:
+                end = min(start + chunk, total)
+                sources = self._sources(separator.separate_batch(waveform[:, start:end]), end - start)
+
+                # Fundido lineal con el bloque anterior en la zona solapada.
+                fade = min(overlap, end - start) if start > 0 else 0
+                voice = self._pick_voice(sources, output[start:start + fade])
+                if fade:
+                    ramp = np.linspace(0.0, 1.0, fade, dtype=np.float32)
+                    output[start:start + fade] = output[start:start + fade] * (1 - ramp) + voice[:fade] * ramp
+                output[start + fade:end] = voice[fade:]
+
+                if end == total:
+                    break
+                start = end - overlap
+
+        return DecodedAudio.from_array(output, self.SAMPLE_RATE)
+
+    @staticmethod
+    def _sources(est_sources, length: int) -> np.ndarray:
+        """Fuentes del bloque ([1, tiempo, fuentes]) como [fuentes, length]."""
+        sources = est_sources[0].T.cpu().numpy()
+        if sources.shape[1] < length:
+            sources = np.pad(sources, ((0, 0), (0, length - sources.shape[1])))
+        return sources[:, :length]
+
+    @staticmethod
+    def _pick_voice(sources: np.ndarray, previous: np.ndarray) -> np.ndarray:
+        """
+        Primer bloque (o solapamiento en silencio): la fuente de mayor energía,
+        la voz más cercana al micrófono. Después, la fuente más correlacionada
+        con la voz ya elegida en la zona solapada, con el signo corregido (el
+        signo de cada fuente es arbitrario y el fundido las cancelaría).
+        """
+        reference = np.linalg.norm(previous)
+        if reference > 1e-6:
+            overlap = sources[:, :len(previous)]
+            correlation = overlap @ previous / np.maximum(np.linalg.norm(overlap, axis=1) * reference, 1e-12)
+            index = int(np.abs(correlation).argmax())
+            return sources[index] if correlation[index] >= 0 else -sources[index]
+        return sources[int((sources ** 2).mean(axis=1).argmax())]
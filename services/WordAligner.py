@@ -0,0 +1,161 @@
+from dataclasses import dataclass, field
+
+SUSTITUCION = "sustitucion"
+OMISION = "omision"
+INSERCION = "insercion"
+
+
+@dataclass
+class Alignment:
+    """Resultado de alinear el texto esperado con lo leído (palabra a palabra)."""
+    similaridad: float
+    coincidencias: int
+    ediciones: int
+    completa: bool = True
+    diferencias: list[dict] = field(default_factory=list)
+
+
+class WordAligner:
+    """
+    Alineación por palabras entre el texto esperado y lo leído.
+
+    Las palabras se internan como enteros. La similaridad es
+    2·coincidencias / (N+M) (la misma definición que SequenceMatcher.ratio),
+    con las coincidencias dadas por la subsecuencia común más larga, que se
+    calcula bit-paralelo en O(N·M/64) sea cual sea el texto. Los tramos de
+    diferencias salen del diff de Myers, O((N+M)·D) con D las palabras
+    insertadas/omitidas: casi lineal para lecturas parecidas al texto.
+    Las omisiones e inserciones contiguas se emparejan como sustituciones.
+    """
+
+    def align(self, expected: list[str], read: list[str], max_edits: int | None = None) -> Alignment:
+        """
+        Alinea las palabras esperadas con las leídas. La similaridad es
+        siempre exacta; si hacen falta más de max_edits ediciones no se
+        calculan los tramos (completa=False).
+        """
+        vocabulary: dict[str, int] = {}
+        a = [vocabulary.setdefault(word, len(vocabulary)) for word in expected]
+        b = [vocabulary.setdefault(word, len(vocabulary)) for word in read]
+        n, m = len(a), len(b)
+        if n + m == 0:
+            return Alignment(1.0, 0, 0)
+
+        matches = self.lcs_length(a, b)
+        edits = n + m - 2 * matches
+        alignment = Alignment(2 * matches / (n + m), matches, edits)
+        if max_edits is not None and edits > max_edits:
+            alignment.completa = False
+            return alignment
+        trace = self._forward(a, b, edits)
+        alignment.diferencias = self._spans(self._backtrack(trace, n, m), expected, read)
+        return alignment
+
+    @staticmethod
+    def lcs_length(a: list[int], b: list[int]) -> int:
+        """
+        Largo de la subsecuencia común más larga (Allison-Dix / Crochemore):
+        cada fila de la tabla de programación dinámica es un entero de M bits.
+        """
+        masks: dict[int, int] = {}
+        for j, token in enumerate(b):
+            masks[token] = masks.get(token, 0) | (1 << j)
+        full = (1 << len(b)) - 1
+        row = full
+        for token in a:
+            matched = row & masks.get(token, 0)
+            row = ((row + matched) | (row - matched)) & full
+        return len(b) - row.bit_count()
+
+    @staticmethod
+    def _forward(a: list[int], b: list[int], limit: int) -> list[dict] | None:
+        """
+        Avance de Myers. Retorna, para cada D, el x más lejano alcanzado en
+        cada diagonal k al terminar ese paso; None si D supera limit.
+        """
+        n, m = len(a), len(b)
+        v = {1: 0}
+        trace = []
+        for d in range(limit + 1):
+            current = {}
+            for k in range(-d, d + 1, 2):
+                if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                    x = v[k + 1]
+                else:
+                    x = v[k - 1] + 1
+                y = x - k
+                while x < n and y < m and a[x] == b[y]:
+                    x += 1
+                    y += 1
+                current[k] = x
+                if x >= n and y >= m:
+                    trace.append(current)
+                    return trace
+            trace.append(current)
+            v = current
+        return None
+
+    @staticmethod
+    def _backtrack(trace: list[dict], n: int, m: int) -> list[tuple[str, int, int]]:
+        """Operaciones ('=', '-', '+') con sus posiciones (i, j), en orden."""
+        ops = []
+        x, y = n, m
+        for d in range(len(trace) - 1, 0, -1):
+            previous = trace[d - 1]
+            k = x - y
+            if k == -d or (k != d and previous.get(k - 1, -1) < previous.get(k + 1, -1)):
+                prev_k = k + 1
+            else:
+                prev_k = k - 1
+            prev_x = previous[prev_k]
+            prev_y = prev_x - prev_k
+            while x > prev_x and y > prev_y:
+                x, y = x - 1, y - 1
+                ops.append(("=", x, y))
+            if x == prev_x:
+                ops.append(("+", x, prev_y))
+            else:
+                ops.append(("-", prev_x, y))
+            x, y = prev_x, prev_y
+        while x > 0 and y > 0:
+            x, y = x - 1, y - 1
+            ops.append(("=", x, y))
+        ops.reverse()
+        return ops
+
+    @staticmethod
+    def _spans(ops: list[tuple[str, int, int]], expected: list[str], read: list[str]) -> list[dict]:
+        """Agrupa las ediciones contiguas en tramos de sustitución/omisión/inserción."""
+        spans = []
+        omitted, inserted = [], []
+
+        def flush():
+            paired = min(len(omitted), len(inserted))
+            if paired:
+                spans.append(WordAligner._span(SUSTITUCION, omitted[:paired], inserted[:paired], expected, read))
+            if len(omitted) > paired:
+                spans.append(WordAligner._span(OMISION, omitted[paired:], [], expected, read))
+            if len(inserted) > paired:
+                spans.append(WordAligner._span(INSERCION, [], inserted[paired:], expected, read))
+            omitted.clear()
+            inserted.clear()
+
+        for op, i, j in ops:
+            if op == "=":
+                flush()
+            elif op == "-":
+                omitted.append(i)
+            else:
+                inserted.append((i, j))
+        flush()
+        return spans
+
+    @staticmethod
+    def _span(kind: str, omitted: list[int], inserted: list[tuple[int, int]],
+              expected: list[str], read: list[str]) -> dict:
+        return {
+            "tipo": kind,
+            "posicion": omitted[0] if omitted else inserted[0][0],
+            "esperado": " ".join(expected[i] for i in omitted),
+            "leido": " ".join(read[j] for _, j in inserted),
+        }
@@ -1,12 +1,24 @@
-from pydub import AudioSegment, silence
-import io
+from .DecodedAudio import DecodedAudio
+from .SilenceDetector import SilenceDetector
+from .Metrics import Metrics
 
 class WpmService:
-    def calculate(self, audio_bytes: bytes, text: str, min_silence_len: int = 2000, silence_thresh: int = -70) -> float:
-        audio = AudioSegment.from_file(io.BytesIO(audio_bytes), format="wav")
-        silent_ranges = silence.detect_silence(audio, min_silence_len=min_silence_len, silence_thresh=silence_thresh)
+    def silent_ranges(self, audio: DecodedAudio | bytes, min_silence_len: int = 2000, silence_thresh: int = -70) -> list[list[int]]:
+        """Rangos [inicio_ms, fin_ms] sin habla; se reutilizan para recortar el audio."""
+        audio = DecodedAudio.of(audio)
+        with Metrics.stage("silencios"):
+            return SilenceDetector.detect_silence(
+                audio.samples, audio.sample_rate, audio.sample_width,
+                min_silence_len=min_silence_len, silence_thresh=silence_thresh,
+            )
+
+    def calculate(self, audio: DecodedAudio | bytes, text: str, min_silence_len: int = 2000, silence_thresh: int = -70,
+                  silent_ranges: list[list[int]] | None = None) -> float:
+        audio = DecodedAudio.of(audio)
+        if silent_ranges is None:
+            silent_ranges = self.silent_ranges(audio, min_silence_len, silence_thresh)
         total_silence = sum((end - start) for start, end in silent_ranges)
-        dur_total_ms = len(audio)
+        dur_total_ms = audio.duration_ms
         active_s = max(0, dur_total_ms - total_silence) / 1000
         word_count = len(text.split())
-        return word_count / (active_s / 60) if active_s > 0 else 0
\ No newline at end of file
+        return word_count / (active_s / 60) if active_s > 0 else 0
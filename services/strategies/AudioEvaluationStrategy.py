@@ -1,14 +1,63 @@
+import os
+import asyncio
+import hashlib
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Tuple, Awaitable, Callable, TypeVar
+from .ProviderGuard import ProviderGuard
+from ..Metrics import Metrics
+
+T = TypeVar("T")
 
 class AudioEvaluationStrategy(ABC):
     """
     Clase base abstracta para estrategias de evaluación de audio.
     Cada subclase implementa evaluación con un modelo diferente.
     """
-    
+
+    # Nombre público del modelo (valor de EvaluationModel) y etiqueta para errores.
+    NAME: str = ""
+    LABEL: str = ""
+
+    # Criterios perceptuales que evalúa el modelo; fluidez_lectora se calcula
+    # localmente a partir de las WPM (FluencyRubricService).
+    CRITERIA = (
+        "estrategia_silabica", "manejo_ritmo",
+        "manejo_respiracion", "precision",
+    )
+
+    # Proveedor del modelo; las estrategias del mismo proveedor comparten el
+    # límite de llamadas en vuelo ({PROVIDER}_MAX_CONCURRENCY, por defecto 8).
+    PROVIDER: str = ""
+    DEFAULT_MAX_CONCURRENCY = 8
+
+    # Formato de audio compacto preferido por el proveedor (ver AudioPreprocessService).
+    AUDIO_FORMAT = "wav"
+
+    _semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _limiter(self) -> asyncio.Semaphore:
+        """Retorna el semáforo que acota las llamadas concurrentes al proveedor."""
+        semaphore = AudioEvaluationStrategy._semaphores.get(self.PROVIDER)
+        if semaphore is None:
+            env_var = f"{self.PROVIDER.upper()}_MAX_CONCURRENCY"
+            limit = int(os.getenv(env_var, self.DEFAULT_MAX_CONCURRENCY))
+            semaphore = asyncio.Semaphore(max(1, limit))
+            AudioEvaluationStrategy._semaphores[self.PROVIDER] = semaphore
+        return semaphore
+
+    async def _call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Llama al proveedor a través de su ProviderGuard y su límite de concurrencia."""
+        return await ProviderGuard.get(self.PROVIDER).call(fn, self.LABEL, self._limiter())
+
+    def _record_usage(self, input_tokens: int | None, output_tokens: int | None, cached_tokens: int | None = None) -> None:
+        """Registra el uso de tokens informado por el proveedor."""
+        for tipo, tokens in (("entrada", input_tokens), ("salida", output_tokens), ("cache", cached_tokens)):
+            if tokens:
+                Metrics.inc("tokens_total", tokens, modelo=self.NAME, tipo=tipo)
+
     @abstractmethod
-    async def evaluate(self, text: str, wpm: float, audio_bytes: bytes) -> Dict[str, Any]:
+    async def evaluate(self, text: str, wpm: float, audio_bytes: bytes, audio_format: str = "wav",
+                       prosody: Dict[str, Any] | None = None) -> Dict[str, Any]:
         """
         Evalúa la lectura del estudiante.
         
@@ -16,19 +65,52 @@ class AudioEvaluationStrategy(ABC):
             text: Texto que el estudiante debía leer
             wpm: Palabras por minuto (velocidad de lectura)
             audio_bytes: Bytes del archivo de audio
+            audio_format: Formato de audio_bytes ('wav' o AUDIO_FORMAT)
+            prosody: Rasgos de ProsodyService (con PROSODY_ENABLED), o None
             
         Returns:
             Diccionario con evaluación según rúbrica
         """
         pass
     
+    async def evaluate_with_model(self, text: str, wpm: float, audio_bytes: bytes, audio_format: str = "wav",
+                                  prosody: Dict[str, Any] | None = None) -> Tuple[str, Dict[str, Any]]:
+        """Como evaluate, pero retorna también el modelo que produjo el resultado."""
+        return self.NAME, await self.evaluate(text, wpm, audio_bytes, audio_format, prosody)
+
+    @classmethod
+    def is_valid(cls, evaluation: Any) -> bool:
+        """Indica si la evaluación trae nivel y comentario para cada criterio."""
+        return isinstance(evaluation, dict) and all(
+            isinstance(evaluation.get(k), dict) and "nivel" in evaluation[k] for k in cls.CRITERIA
+        )
+
+    @staticmethod
+    def _build_user_prompt(text: str, wpm: float, prosody: Dict[str, Any] | None = None) -> str:
+        """Parte variable del prompt; la rúbrica va aparte como prefijo estable."""
+        prompt = f"Texto a leer: {text}\nWPM: {wpm:.1f}"
+        if prosody:
+            prompt += (
+                f"\nProsodia (medida localmente): {prosody['pausas']} pausas de {prosody['pausa_media_s']:.2f} s "
+                f"en promedio; {prosody['pausas_en_puntuacion']}/{prosody['puntuaciones']} signos de puntuación "
+                f"con pausa y {prosody['pausas_fuera_de_puntuacion']} pausas fuera de la puntuación; "
+                f"variación de tono {prosody['variacion_tono_st']:.1f} st (rango {prosody['rango_tono_st']:.1f} st); "
+                f"{prosody['silabas_por_segundo']:.1f} sílabas/s."
+            )
+        return prompt
+
+    @classmethod
+    def rubric_version(cls) -> str:
+        """Versión de la rúbrica; cambia cuando cambian las instrucciones."""
+        return hashlib.sha256(cls._get_system_instructions().encode("utf-8")).hexdigest()[:12]
+
     @staticmethod
     def _get_system_instructions() -> str:
         """Retorna las instrucciones del sistema para la evaluación."""
         return """
 Sos una psicopedagoga experta en evaluación lectora infantil. Vas a recibir dos elementos:
 un texto que el estudiante debía leer y las métricas de lectura.
-Tu tarea es analizar la lectura y evaluar el desempeño del estudiante en base a los siguientes 5 criterios, usando esta rúbrica:
+Tu tarea es analizar la lectura y evaluar el desempeño del estudiante en base a los siguientes 4 criterios, usando esta rúbrica:
 
 Rúbrica de lectura (por niveles de desempeño):
 
@@ -72,19 +154,12 @@ b) DISTINCIÓN INICIAL vs EN PROCESO: "Inicial" = error de LETRA dentro de una p
 
 c) ERROR FRECUENTE A EVITAR: La precisión se mide comparando las PALABRAS LEÍDAS con las PALABRAS DEL TEXTO. Si la transcripción muestra palabras distintas al texto original, eso es un error de precisión aunque cada sonido esté bien articulado. La calidad fonémica de las palabras incorrectas no suma para este criterio.
 
-5. Fluidez Lectora (se mide en palabras por minuto)
-• Inicial: 0-49 palabras por minuto = Etapa fonológica.
-• En proceso: 50-70 palabras por minuto = Etapa ortográfica.
-• Logrado: 71-90 palabras por minuto = Etapa de Transición hacia Expresiva.
-• Avanzado: 90-200 palabras por minuto = Etapa Expresiva Consolidada.
-
 Ejemplo de salida válida:
 {
   "estrategia_silabica": {"nivel": "Logrado", "comentario": "El alumno..."},
   "manejo_ritmo": {"nivel": "En proceso", "comentario": "Lee de forma monótona..."},
   "manejo_respiracion": {"nivel": "Inicial", "comentario": "No hace pausas en puntos..."},
-  "precision": {"nivel": "Avanzado", "comentario": "Lee sin errores..."},
-  "fluidez_lectora": {"nivel": "En proceso", "comentario": "80 palabras en 1m20s => 60 WPM"}
+  "precision": {"nivel": "Avanzado", "comentario": "Lee sin errores..."}
 }
 
 IMPORTANTE: Devuelve **solo** este objeto JSON, sin texto libre, sin claves extra, sin comillas alrededor del json.
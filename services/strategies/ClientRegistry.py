@@ -0,0 +1,72 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class ClientRegistry:
+    """
+    Clientes de los proveedores compartidos por todo el proceso.
+    Cada proveedor mantiene su propio pool de conexiones keep-alive, cuyo
+    tamaño se configura con HTTP_MAX_CONNECTIONS / HTTP_MAX_KEEPALIVE.
+    GEMINI_TIMEOUT_SECONDS acota cada llamada a Gemini: una conexión colgada
+    no retiene para siempre su lugar en el limitador de concurrencia.
+    """
+
+    _gemini = None
+    _openai = None
+    _http_clients: list = []
+
+    @staticmethod
+    def _limits():
+        """Límites del pool de conexiones HTTP de cada proveedor."""
+        import httpx
+
+        return httpx.Limits(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+        )
+
+    @classmethod
+    def gemini(cls):
+        """Retorna el cliente de Gemini, creándolo en el primer uso."""
+        if cls._gemini is None:
+            import httpx
+            from google import genai
+            from google.genai import types
+
+            timeout = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "120"))
+            http_client = httpx.AsyncClient(limits=cls._limits(), timeout=httpx.Timeout(timeout, connect=10.0))
+            cls._http_clients.append(http_client)
+            cls._gemini = genai.Client(
+                api_key=os.getenv("GEMINI_API_KEY"),
+                # genai pasa su propio timeout (en ms) en cada request y, sin
+                # él, lo manda como None: pisaría el del cliente httpx.
+                http_options=types.HttpOptions(httpx_async_client=http_client, timeout=int(timeout * 1000)),
+            )
+        return cls._gemini
+
+    @classmethod
+    def openai(cls):
+        """Retorna el cliente async de OpenAI, creándolo en el primer uso."""
+        if cls._openai is None:
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+            cls._openai = AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                max_retries=0,  # los reintentos los maneja ProviderGuard
+                http_client=DefaultAsyncHttpxClient(limits=cls._limits()),
+            )
+        return cls._openai
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Cierra los pools de conexiones de todos los proveedores."""
+        if cls._openai is not None:
+            await cls._openai.close()
+        for http_client in cls._http_clients:
+            await http_client.aclose()
+        cls._gemini = None
+        cls._openai = None
+        cls._http_clients = []
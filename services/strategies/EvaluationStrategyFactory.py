@@ -1,8 +1,14 @@
+import os
+import time
+import logging
 from enum import Enum
+from importlib import import_module
 from .AudioEvaluationStrategy import AudioEvaluationStrategy
-from .GeminiEvaluationStrategy import GeminiEvaluationStrategy
-from .GeminiProEvaluationStrategy import GeminiProEvaluationStrategy
-from .OpenAIEvaluationStrategy import OpenAIEvaluationStrategy
+from .HedgedEvaluationStrategy import HedgedEvaluationStrategy
+from .ClientRegistry import ClientRegistry
+from ..Metrics import Metrics
+
+logger = logging.getLogger(__name__)
 
 
 class EvaluationModel(Enum):
@@ -10,20 +16,29 @@ class EvaluationModel(Enum):
     GEMINI_FLASH = "gemini-flash"
     GEMINI_PRO = "gemini-pro"
     OPENAI_AUDIO = "openai-audio"
+    AUTO = "auto"
 
 
 class EvaluationStrategyFactory:
-    """Factory para crear estrategias de evaluación."""
-    
+    """
+    Factory de estrategias de evaluación.
+    Las estrategias se crean una sola vez y viven durante todo el proceso,
+    compartiendo los clientes (y sus pools de conexiones) de ClientRegistry.
+    El módulo de cada estrategia (y el SDK de su proveedor) se importa recién
+    cuando el modelo se usa por primera vez.
+    """
+
     _strategies = {
-        EvaluationModel.GEMINI_FLASH: GeminiEvaluationStrategy,
-        EvaluationModel.GEMINI_PRO: GeminiProEvaluationStrategy,
-        EvaluationModel.OPENAI_AUDIO: OpenAIEvaluationStrategy,
+        EvaluationModel.GEMINI_FLASH: ".GeminiEvaluationStrategy:GeminiEvaluationStrategy",
+        EvaluationModel.GEMINI_PRO: ".GeminiProEvaluationStrategy:GeminiProEvaluationStrategy",
+        EvaluationModel.OPENAI_AUDIO: ".OpenAIEvaluationStrategy:OpenAIEvaluationStrategy",
     }
-    
+
+    _instances: dict[EvaluationModel, AudioEvaluationStrategy] = {}
+
     @classmethod
     def create(cls, model: str | EvaluationModel = EvaluationModel.GEMINI_FLASH) -> AudioEvaluationStrategy:
-        """Crea instancia de estrategia."""
+        """Retorna la instancia compartida de la estrategia."""
         if isinstance(model, str):
             try:
                 model = EvaluationModel(model.lower())
@@ -33,12 +48,57 @@ class EvaluationStrategyFactory:
                     f"Opciones: {', '.join([m.value for m in EvaluationModel])}"
                 )
         
-        strategy_class = cls._strategies.get(model)
-        if strategy_class is None:
-            raise ValueError(f"No hay estrategia para {model}")
-        
-        return strategy_class()
-    
+        strategy = cls._instances.get(model)
+        if strategy is None and model is EvaluationModel.AUTO:
+            strategy = cls._instances[model] = HedgedEvaluationStrategy(
+                [cls.create(name) for name in HedgedEvaluationStrategy.order()]
+            )
+        if strategy is None:
+            path = cls._strategies.get(model)
+            if path is None:
+                raise ValueError(f"No hay estrategia para {model}")
+            strategy = cls._instances[model] = cls._load(path)()
+        return strategy
+
+    @staticmethod
+    def _load(path: str) -> type[AudioEvaluationStrategy]:
+        """Importa 'modulo:Clase' registrando cuánto tardó la carga."""
+        module_name, class_name = path.split(":")
+        start = time.perf_counter()
+        module = import_module(module_name, __package__)
+        elapsed = time.perf_counter() - start
+        Metrics.observe("carga_modulo_segundos", elapsed, modulo=module.__name__)
+        logger.info("Estrategia %s cargada en %.0f ms", class_name, elapsed * 1000)
+        return getattr(module, class_name)
+
+    @classmethod
+    def register(cls, model: str | EvaluationModel, strategy: AudioEvaluationStrategy) -> None:
+        """Reemplaza la estrategia de un modelo (p. ej. por un proveedor simulado)."""
+        cls._instances[EvaluationModel(model)] = strategy
+
+    @classmethod
+    def startup(cls) -> None:
+        """
+        Pre-calienta las estrategias de PREWARM_MODELS ('all' o una lista
+        separada por comas) al iniciar la app. Por defecto no carga ninguna:
+        en serverless cada arranque en frío paga sólo el modelo que se usa.
+        """
+        prewarm = os.getenv("PREWARM_MODELS", "").strip().lower()
+        if not prewarm:
+            return
+        if prewarm == "all":
+            models = list(EvaluationModel)
+        else:
+            models = [name.strip() for name in prewarm.split(",") if name.strip()]
+        for model in models:
+            cls.create(model)
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """Descarta las estrategias y cierra los clientes de los proveedores."""
+        cls._instances.clear()
+        await ClientRegistry.aclose()
+
     @classmethod
     def get_available_models(cls) -> list[str]:
         """Retorna lista de modelos disponibles."""
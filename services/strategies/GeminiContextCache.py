@@ -0,0 +1,77 @@
+import os
+import time
+import asyncio
+import logging
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+
+class GeminiContextCache:
+    """
+    Cached content de Gemini con la rúbrica como system instruction, uno por
+    modelo. Se crea en el primer uso y se le extiende el TTL
+    (GEMINI_CACHE_TTL_SECONDS) antes de que venza. Si el proveedor lo rechaza
+    (p. ej. por no alcanzar el mínimo de tokens) se reintenta más tarde y,
+    mientras tanto, la rúbrica viaja como system instruction común.
+    """
+
+    REFRESH_MARGIN = 300
+    RETRY_AFTER_FAILURE = 600
+
+    def __init__(self, client):
+        self.client = client
+        self.enabled = os.getenv("GEMINI_CONTEXT_CACHE", "true").lower() == "true"
+        self.ttl = int(os.getenv("GEMINI_CACHE_TTL_SECONDS", "3600"))
+        self._entries: dict[str, tuple[str, float]] = {}
+        self._failed_until: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def get(self, model: str, system_instruction: str) -> str | None:
+        """Nombre del cached content vigente para el modelo, o None si no hay."""
+        if not self.enabled or self._failed_until.get(model, 0) > time.monotonic():
+            return None
+        entry = self._entries.get(model)
+        if entry is not None and entry[1] - time.monotonic() > self.REFRESH_MARGIN:
+            return entry[0]
+
+        lock = self._locks.setdefault(model, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(model)
+            if entry is not None and entry[1] - time.monotonic() > self.REFRESH_MARGIN:
+                return entry[0]
+            try:
+                name = await self._refresh(entry[0]) if entry else None
+                if name is None:
+                    name = await self._create(model, system_instruction)
+            except Exception as e:
+                logger.warning("No se pudo crear el cached content de %s: %s", model, e)
+                self._entries.pop(model, None)
+                self._failed_until[model] = time.monotonic() + self.RETRY_AFTER_FAILURE
+                return None
+            self._entries[model] = (name, time.monotonic() + self.ttl)
+            return name
+
+    def invalidate(self, model: str) -> None:
+        """Descarta el handle (p. ej. si el proveedor ya no lo reconoce)."""
+        self._entries.pop(model, None)
+
+    async def _create(self, model: str, system_instruction: str) -> str:
+        cache = await self.client.aio.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                display_name="rubrica-lectura",
+                system_instruction=system_instruction,
+                ttl=f"{self.ttl}s",
+            ),
+        )
+        return cache.name
+
+    async def _refresh(self, name: str) -> str | None:
+        try:
+            await self.client.aio.caches.update(
+                name=name, config=types.UpdateCachedContentConfig(ttl=f"{self.ttl}s")
+            )
+            return name
+        except Exception:
+            return None
@@ -1,11 +1,10 @@
-import os
-from dotenv import load_dotenv
+import json
 from pydantic import BaseModel
-from google import genai
 from google.genai import types
 from .AudioEvaluationStrategy import AudioEvaluationStrategy
-
-load_dotenv()
+from .ProviderGuard import ProviderError
+from .ClientRegistry import ClientRegistry
+from .GeminiContextCache import GeminiContextCache
 
 
 class Criterio(BaseModel):
@@ -18,30 +17,75 @@ class EvaluacionLectura(BaseModel):
     manejo_ritmo: Criterio
     manejo_respiracion: Criterio
     precision: Criterio
-    fluidez_lectora: Criterio
 
 
 class GeminiEvaluationStrategy(AudioEvaluationStrategy):
     """Estrategia usando Gemini 3.5 Flash (stable, rápido)."""
 
+    NAME = "gemini-flash"
+    PROVIDER = "gemini"
     MODEL = "gemini-3.5-flash"
+    LABEL = "Gemini Flash"
+    AUDIO_FORMAT = "flac"
 
-    def __init__(self):
-        self.client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    def __init__(self, client=None):
+        self.client = client or ClientRegistry.gemini()
+        self.context_cache = GeminiContextCache(self.client)
 
-    async def evaluate(self, text: str, wpm: float, audio_bytes: bytes) -> dict:
+    async def evaluate(self, text: str, wpm: float, audio_bytes: bytes, audio_format: str = "wav",
+                       prosody: dict | None = None) -> dict:
         try:
-            response = self.client.models.generate_content(
-                model=self.MODEL,
-                contents=[
-                    f"{self._get_system_instructions()}\n\nTexto: {text}\nWPM: {wpm:.1f}",
-                    types.Part.from_bytes(data=audio_bytes, mime_type="audio/wav"),
-                ],
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    response_schema=EvaluacionLectura,
-                ),
-            )
-            return response.parsed.model_dump() if response.parsed else __import__("json").loads(response.text)
+            # La rúbrica es un prefijo estable: cached content si está
+            # disponible, o system instruction (nunca mezclada con el texto).
+            system_instructions = self._get_system_instructions()
+            cached_content = await self.context_cache.get(self.MODEL, system_instructions)
+            contents = [
+                self._build_user_prompt(text, wpm, prosody),
+                types.Part.from_bytes(data=audio_bytes, mime_type=f"audio/{audio_format}"),
+            ]
+
+            def generate(cached_content):
+                # Cliente async (client.aio): no bloquea el event loop mientras
+                # esperamos al modelo.
+                return self._call(lambda: self.client.aio.models.generate_content(
+                    model=self.MODEL,
+                    contents=contents,
+                    config=types.GenerateContentConfig(
+                        cached_content=cached_content,
+                        system_instruction=None if cached_content else system_instructions,
+                        response_mime_type="application/json",
+                        response_schema=EvaluacionLectura,
+                    ),
+                ))
+
+            try:
+                response = await generate(cached_content)
+            except ProviderError as e:
+                if cached_content is None or not self._cache_gone(e):
+                    raise
+                # El cached content venció o fue borrado: se descarta y se reintenta sin él.
+                self.context_cache.invalidate(self.MODEL)
+                response = await generate(None)
+            usage = response.usage_metadata
+            if usage is not None:
+                self._record_usage(usage.prompt_token_count, usage.candidates_token_count,
+                                   usage.cached_content_token_count)
+            return response.parsed.model_dump() if response.parsed else json.loads(response.text)
+        except ProviderError:
+            raise
         except Exception as e:
-            raise Exception(f"Error Gemini Flash: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error {self.LABEL}: {str(e)}")
+
+    @staticmethod
+    def _cache_gone(error: ProviderError) -> bool:
+        """
+        El error es por el cached content (vencido o borrado) y no por la
+        request: solo así vale la pena reintentar. Otros 400 (audio no
+        soportado, request mal formada) fallarían igual y se cobrarían dos veces.
+        """
+        if error.status in (403, 404):
+            return True
+        message = str(error).lower()
+        return error.status == 400 and "cache" in message and any(
+            word in message for word in ("expired", "not found", "does not exist")
+        )
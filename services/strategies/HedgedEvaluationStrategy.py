@@ -0,0 +1,104 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Any, Tuple
+from .AudioEvaluationStrategy import AudioEvaluationStrategy
+from .ProviderGuard import ProviderError, ProviderUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+class HedgedEvaluationStrategy(AudioEvaluationStrategy):
+    """
+    Modo 'auto': consulta los modelos en el orden de AUTO_MODEL_ORDER.
+    Si el modelo en curso no respondió dentro de su presupuesto (p95 observado
+    o HEDGE_BUDGET_<MODELO> segundos mientras no haya muestras suficientes),
+    lanza una consulta de respaldo al siguiente; gana el primer resultado
+    válido. Si un modelo falla se pasa inmediatamente al siguiente.
+    Si fallan todos por errores de proveedor, el error conserva ese tipo
+    (y el Retry-After más corto si todos estaban en pausa).
+    """
+
+    NAME = "auto"
+    # Todos los proveedores aceptan WAV.
+    AUDIO_FORMAT = "wav"
+
+    DEFAULT_ORDER = "gemini-flash,openai-audio,gemini-pro"
+    DEFAULT_BUDGETS = {"gemini-flash": 10.0, "openai-audio": 15.0, "gemini-pro": 40.0}
+    MIN_SAMPLES = 20
+
+    def __init__(self, strategies: list[AudioEvaluationStrategy]):
+        self.strategies = strategies
+        self._latencies: dict[str, deque] = {s.NAME: deque(maxlen=200) for s in strategies}
+
+    @staticmethod
+    def order() -> list[str]:
+        """Modelos configurados para el modo auto, en orden de preferencia."""
+        value = os.getenv("AUTO_MODEL_ORDER", HedgedEvaluationStrategy.DEFAULT_ORDER)
+        return [name.strip() for name in value.split(",") if name.strip()]
+
+    def budget(self, name: str) -> float:
+        """Segundos a esperar al modelo antes de lanzar la consulta de respaldo."""
+        samples = self._latencies[name]
+        if len(samples) >= self.MIN_SAMPLES:
+            ordered = sorted(samples)
+            return ordered[int(0.95 * (len(ordered) - 1))]
+        env_var = f"HEDGE_BUDGET_{name.upper().replace('-', '_')}"
+        return float(os.getenv(env_var, self.DEFAULT_BUDGETS.get(name, 15.0)))
+
+    async def evaluate(self, text: str, wpm: float, audio_bytes: bytes, audio_format: str = "wav",
+                       prosody: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        return (await self.evaluate_with_model(text, wpm, audio_bytes, audio_format, prosody))[1]
+
+    async def evaluate_with_model(self, text: str, wpm: float, audio_bytes: bytes, audio_format: str = "wav",
+                                  prosody: Dict[str, Any] | None = None) -> Tuple[str, Dict[str, Any]]:
+        queue = list(self.strategies)
+        pending: dict[asyncio.Task, str] = {}
+        errors = []
+        failures: list[BaseException | None] = []
+        hedge_at = 0.0
+
+        def launch():
+            nonlocal hedge_at
+            strategy = queue.pop(0)
+            task = asyncio.create_task(self._timed(strategy, text, wpm, audio_bytes, audio_format, prosody))
+            pending[task] = strategy.NAME
+            hedge_at = time.monotonic() + self.budget(strategy.NAME)
+
+        launch()
+        try:
+            while pending:
+                timeout = max(0.0, hedge_at - time.monotonic()) if queue else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info("Sin respuesta dentro del presupuesto, se consulta %s", queue[0].NAME)
+                    launch()
+                    continue
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is None and self.is_valid(task.result()):
+                        return name, task.result()
+                    errors.append(f"{name}: {task.exception() or 'respuesta inválida'}")
+                    failures.append(task.exception())
+                if queue and not pending:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        message = f"Error modo auto, fallaron todos los modelos: {'; '.join(errors)}"
+        if all(isinstance(e, ProviderUnavailableError) for e in failures):
+            retry_after = [e.retry_after for e in failures if e.retry_after]
+            raise ProviderUnavailableError(message, retry_after=min(retry_after, default=None))
+        if all(isinstance(e, ProviderError) for e in failures):
+            raise ProviderError(message)
+        raise Exception(message)
+
+    async def _timed(self, strategy: AudioEvaluationStrategy, text: str, wpm: float,
+                     audio_bytes: bytes, audio_format: str, prosody: Dict[str, Any] | None) -> Dict[str, Any]:
+        start = time.monotonic()
+        result = await strategy.evaluate(text, wpm, audio_bytes, audio_format, prosody)
+        self._latencies[strategy.NAME].append(time.monotonic() - start)
+        return result
@@ -1,11 +1,9 @@
-import os
 import json
 import base64
-from openai import OpenAI
-from dotenv import load_dotenv
 from .AudioEvaluationStrategy import AudioEvaluationStrategy
-
-load_dotenv()
+from .ClientRegistry import ClientRegistry
+from .ProviderGuard import ProviderError
+from ..Metrics import Metrics
 
 EVALUAR_TOOL = {
     "type": "function",
@@ -20,15 +18,9 @@ EVALUAR_TOOL = {
                     "properties": {"nivel": {"type": "string"}, "comentario": {"type": "string"}},
                     "required": ["nivel", "comentario"],
                 }
-                for k in [
-                    "estrategia_silabica", "manejo_ritmo",
-                    "manejo_respiracion", "precision", "fluidez_lectora",
-                ]
+                for k in AudioEvaluationStrategy.CRITERIA
             },
-            "required": [
-                "estrategia_silabica", "manejo_ritmo",
-                "manejo_respiracion", "precision", "fluidez_lectora",
-            ],
+            "required": list(AudioEvaluationStrategy.CRITERIA),
         },
     },
 }
@@ -37,14 +29,22 @@ EVALUAR_TOOL = {
 class OpenAIEvaluationStrategy(AudioEvaluationStrategy):
     """Estrategia usando gpt-audio-1.5 (audio in, texto out)."""
 
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    NAME = "openai-audio"
+    LABEL = "OpenAI"
+    PROVIDER = "openai"
+    # input_audio solo acepta wav y mp3; WAV mono de 16 kHz ya es compacto.
+    AUDIO_FORMAT = "wav"
+
+    def __init__(self, client=None):
+        self.client = client or ClientRegistry.openai()
 
-    async def evaluate(self, text: str, wpm: float, audio_bytes: bytes) -> dict:
+    async def evaluate(self, text: str, wpm: float, audio_bytes: bytes, audio_format: str = "wav",
+                       prosody: dict | None = None) -> dict:
         try:
-            audio_b64 = base64.b64encode(audio_bytes).decode("utf-8")
+            with Metrics.stage("base64"):
+                audio_b64 = base64.b64encode(audio_bytes).decode("utf-8")
 
-            response = self.client.chat.completions.create(
+            response = await self._call(lambda: self.client.chat.completions.create(
                 model="gpt-audio-1.5",
                 # OJO: sin "audio" en modalities -> no generamos audio de salida,
                 # solo necesitamos texto/JSON.
@@ -54,18 +54,29 @@ class OpenAIEvaluationStrategy(AudioEvaluationStrategy):
                     {
                         "role": "user",
                         "content": [
-                            {"type": "text", "text": f"Texto a leer: {text}\nWPM: {wpm:.1f}"},
-                            {"type": "input_audio", "input_audio": {"data": audio_b64, "format": "wav"}},
+                            {"type": "text", "text": self._build_user_prompt(text, wpm, prosody)},
+                            {"type": "input_audio", "input_audio": {"data": audio_b64, "format": audio_format}},
                         ],
                     },
                 ],
                 tools=[EVALUAR_TOOL],
                 tool_choice={"type": "function", "function": {"name": "evaluar_lectura"}},
                 temperature=0,
-            )
+                # El system message con la rúbrica es un prefijo idéntico en
+                # todas las llamadas; la clave agrupa el prompt caching.
+                extra_body={"prompt_cache_key": f"rubrica-{self.rubric_version()}"},
+            ))
+
+            usage = response.usage
+            if usage is not None:
+                details = getattr(usage, "prompt_tokens_details", None)
+                self._record_usage(usage.prompt_tokens, usage.completion_tokens,
+                                   getattr(details, "cached_tokens", None))
 
             tool_call = response.choices[0].message.tool_calls[0]
             return json.loads(tool_call.function.arguments)
 
+        except ProviderError:
+            raise
         except Exception as e:
-            raise Exception(f"Error OpenAI: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error {self.LABEL}: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,241 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from typing import Awaitable, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMIABIERTO = "semiabierto"
+
+
+class ProviderError(Exception):
+    """Error de un proveedor, con el status HTTP y el Retry-After si los hay."""
+
+    def __init__(self, message: str, status: int | None = None, retry_after: float | None = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        """Errores transitorios: 408, 429, 5xx o fallas de conexión sin status."""
+        return self.status is None or self.status in (408, 429) or self.status >= 500
+
+    @classmethod
+    def from_exception(cls, label: str, exc: Exception) -> "ProviderError":
+        if isinstance(exc, ProviderError):
+            return exc
+        # openai usa status_code; google.genai.errors.APIError usa code.
+        status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+        if not isinstance(status, int):
+            status = None
+        headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+        try:
+            retry_after = float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            retry_after = None
+        return cls(f"Error {label}: {str(exc)}", status=status, retry_after=retry_after)
+
+
+class ProviderUnavailableError(ProviderError):
+    """El proveedor está en pausa (circuito abierto o sin cupo); se descarta sin llamarlo."""
+
+
+class TokenBucket:
+    """
+    Limitador de tasa adaptativo (AIMD): cada 429 reduce la tasa a la mitad
+    y cada éxito la recupera de a poco hasta el máximo configurado. Un
+    Retry-After del proveedor frena todas las llamadas hasta ese momento
+    (aunque no haya límite de tasa configurado).
+    """
+
+    def __init__(self, rate: float, capacity: float, max_wait: float):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = max_wait
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self.paused_until = 0.0
+
+    async def acquire(self, label: str) -> None:
+        now = time.monotonic()
+        wait = max(0.0, self.paused_until - now)
+        if self.max_rate > 0:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self.tokens < 1:
+                wait = max(wait, (1 - self.tokens) / self.rate)
+        if wait > self.max_wait:
+            raise ProviderUnavailableError(
+                f"Error {label}: límite de tasa alcanzado, reintentá más tarde.", status=429, retry_after=wait
+            )
+        # Se reserva el token (el saldo puede quedar negativo) y se espera su turno.
+        if self.max_rate > 0:
+            self.tokens -= 1
+        if wait:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Retry-After: ninguna llamada sale antes de `seconds` segundos."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def throttle(self) -> None:
+        if self.max_rate > 0:
+            self.rate = max(self.max_rate * 0.1, self.rate * 0.5)
+
+    def recover(self) -> None:
+        if self.max_rate > 0:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class CircuitBreaker:
+    """
+    Se abre tras `threshold` fallas transitorias consecutivas y rechaza
+    llamadas hasta que vence la pausa; luego deja pasar una sola llamada de
+    prueba (semiabierto). Un Retry-After cuenta como una falla más: lo
+    respeta el token bucket, sin cortar el tráfico de todo el proveedor.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = CERRADO
+        self.failures = 0
+        self.open_until = 0.0
+        self._probing = False
+
+    def before_call(self, label: str) -> None:
+        if self.state == CERRADO:
+            return
+        remaining = self.open_until - time.monotonic()
+        if self.state == ABIERTO and remaining <= 0:
+            self.state = SEMIABIERTO
+        if self.state == ABIERTO or self._probing:
+            raise ProviderUnavailableError(
+                f"Error {label}: proveedor no disponible temporalmente.", retry_after=max(remaining, 1.0)
+            )
+        self._probing = True
+
+    def cancel_probe(self) -> None:
+        """La llamada se canceló sin resultado: libera el lugar de la prueba."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.state = CERRADO
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self, error: ProviderError) -> None:
+        self._probing = False
+        self.failures += 1
+        if self.state == SEMIABIERTO or self.failures >= self.threshold:
+            pause = max(self.reset_timeout, error.retry_after or 0)
+            self.state = ABIERTO
+            self.open_until = time.monotonic() + pause
+
+
+class ProviderGuard:
+    """
+    Protección por proveedor delante de las estrategias: circuit breaker,
+    token bucket y reintentos con backoff exponencial con jitter (o el
+    Retry-After del proveedor). Se configura con variables {PROVEEDOR}_*:
+    RATE_LIMIT (req/s, 0 = sin límite), BURST, RATE_LIMIT_MAX_WAIT,
+    BREAKER_THRESHOLD, BREAKER_RESET_SECONDS, MAX_RETRIES y MAX_RETRY_DELAY.
+    """
+
+    _guards: dict[str, "ProviderGuard"] = {}
+
+    BACKOFF_BASE = 0.5
+    BACKOFF_CAP = 8.0
+
+    def __init__(self, provider: str):
+        self.provider = provider
+
+        def env(name: str, default: str) -> float:
+            return float(os.getenv(f"{provider.upper()}_{name}", default))
+
+        rate = env("RATE_LIMIT", "0")
+        self.bucket = TokenBucket(rate, max(1.0, env("BURST", str(max(rate, 1)))), env("RATE_LIMIT_MAX_WAIT", "5"))
+        self.breaker = CircuitBreaker(int(env("BREAKER_THRESHOLD", "5")), env("BREAKER_RESET_SECONDS", "30"))
+        self.max_retries = int(env("MAX_RETRIES", "2"))
+        self.max_retry_delay = env("MAX_RETRY_DELAY", "10")
+        self.calls = 0
+        self.failures = 0
+        self.shed = 0
+
+    @classmethod
+    def get(cls, provider: str) -> "ProviderGuard":
+        guard = cls._guards.get(provider)
+        if guard is None:
+            guard = cls._guards[provider] = cls(provider)
+        return guard
+
+    @classmethod
+    def states(cls) -> dict:
+        return {provider: guard.state() for provider, guard in cls._guards.items()}
+
+    async def call(self, fn: Callable[[], Awaitable[T]], label: str, limiter: asyncio.Semaphore) -> T:
+        """Ejecuta fn con reintentos; los errores salen como ProviderError."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.breaker.before_call(label)
+            except ProviderUnavailableError:
+                self.shed += 1
+                raise
+            try:
+                await self.bucket.acquire(label)
+            except ProviderUnavailableError:
+                # No se llamó al proveedor: si era la prueba del semiabierto, queda libre.
+                self.breaker.cancel_probe()
+                self.shed += 1
+                raise
+            except asyncio.CancelledError:
+                self.breaker.cancel_probe()
+                raise
+
+            self.calls += 1
+            try:
+                async with limiter:
+                    result = await fn()
+            except asyncio.CancelledError:
+                self.breaker.cancel_probe()
+                raise
+            except Exception as e:
+                error = ProviderError.from_exception(label, e)
+                self.failures += 1
+                if not error.retryable:
+                    self.breaker.record_success()  # el proveedor respondió; el error es nuestro
+                    raise error from e
+                self.breaker.record_failure(error)
+                if error.status == 429:
+                    self.bucket.throttle()
+                if error.retry_after:
+                    self.bucket.pause(error.retry_after)
+
+                delay = error.retry_after or random.uniform(0, min(self.BACKOFF_CAP, self.BACKOFF_BASE * 2 ** attempt))
+                if attempt == self.max_retries or delay > self.max_retry_delay:
+                    raise error from e
+                logger.warning("%s (intento %d), reintento en %.1fs", error, attempt + 1, delay)
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                self.bucket.recover()
+                return result
+
+    def state(self) -> dict:
+        return {
+            "circuito": self.breaker.state,
+            "fallas_consecutivas": self.breaker.failures,
+            "reabre_en_s": round(max(0.0, self.breaker.open_until - time.monotonic()), 1),
+            "tasa_req_s": self.bucket.rate or None,
+            "llamadas": self.calls,
+            "fallas": self.failures,
+            "descartadas": self.shed,
+        }
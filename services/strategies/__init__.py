@@ -1,20 +1,50 @@
 """
 Módulo de estrategias de evaluación de audio.
 Patrón Strategy para múltiples modelos de IA.
+
+Los módulos se importan recién cuando se usa el nombre (PEP 562), así
+importar el paquete no carga los SDKs de los proveedores.
 """
 
-from .AudioEvaluationStrategy import AudioEvaluationStrategy
-from .GeminiEvaluationStrategy import GeminiEvaluationStrategy
-from .GeminiProEvaluationStrategy import GeminiProEvaluationStrategy
-from .OpenAIEvaluationStrategy import OpenAIEvaluationStrategy
-from .EvaluationStrategyFactory import EvaluationStrategyFactory, EvaluationModel
-
-__all__ = [
-    "AudioEvaluationStrategy",
-    "GeminiEvaluationStrategy",
-    "GeminiProEvaluationStrategy",
-    "OpenAIEvaluationStrategy",
-    "EvaluationStrategyFactory",
-    "EvaluationModel",
-]
+import sys
+from importlib import import_module
+from types import ModuleType
+
+_EXPORTS = {
+    "AudioEvaluationStrategy": ".AudioEvaluationStrategy",
+    "GeminiEvaluationStrategy": ".GeminiEvaluationStrategy",
+    "GeminiProEvaluationStrategy": ".GeminiProEvaluationStrategy",
+    "OpenAIEvaluationStrategy": ".OpenAIEvaluationStrategy",
+    "HedgedEvaluationStrategy": ".HedgedEvaluationStrategy",
+    "ClientRegistry": ".ClientRegistry",
+    "EvaluationStrategyFactory": ".EvaluationStrategyFactory",
+    "EvaluationModel": ".EvaluationStrategyFactory",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _Package(ModuleType):
+    def __setattr__(self, name, value):
+        # Al importarse un submódulo, el import system lo asigna como atributo
+        # del paquete; como cada módulo se llama igual que su clase, se deja
+        # la clase (igual que hacía el `from .X import X` eager).
+        if isinstance(value, ModuleType) and name in _EXPORTS:
+            value = getattr(value, name, value)
+        super().__setattr__(name, value)
+
 
+sys.modules[__name__].__class__ = _Package
@@ -0,0 +1,21 @@
+import pytest
+from services.FluencyRubricService import FluencyRubricService
+
+
+@pytest.mark.parametrize("wpm, nivel, redondeado", [
+    (0.0, "Inicial", 0),
+    (49.0, "Inicial", 49),
+    (49.49, "Inicial", 49),
+    (49.5, "En proceso", 50),
+    (50.0, "En proceso", 50),
+    (70.0, "En proceso", 70),
+    (70.5, "Logrado", 71),
+    (71.5, "Logrado", 72),
+    (90.49, "Logrado", 90),
+    (90.5, "Avanzado", 91),
+    (150.0, "Avanzado", 150),
+])
+def test_band_edges(wpm, nivel, redondeado):
+    result = FluencyRubricService().evaluate(wpm)
+    assert result["nivel"] == nivel
+    assert result["comentario"].startswith(f"{redondeado} palabras por minuto => ")
@@ -0,0 +1,15 @@
+import pytest
+from services.strategies.GeminiEvaluationStrategy import GeminiEvaluationStrategy
+from services.strategies.ProviderGuard import ProviderError
+
+
+@pytest.mark.parametrize("message, status, gone", [
+    ("CachedContent not found (or permission denied)", 403, True),
+    ("Not found", 404, True),
+    ("Cache content 1234 is expired.", 400, True),
+    ("Unsupported MIME type: audio/flac", 400, False),
+    ("Request contains an invalid argument.", 400, False),
+    ("Internal error", 500, False),
+])
+def test_only_cache_errors_retry_without_cached_content(message, status, gone):
+    assert GeminiEvaluationStrategy._cache_gone(ProviderError(message, status=status)) is gone
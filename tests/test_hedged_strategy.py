@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from services.strategies.HedgedEvaluationStrategy import HedgedEvaluationStrategy
+from services.strategies.ProviderGuard import ProviderError, ProviderUnavailableError
+
+
+class Failing:
+    def __init__(self, name: str, error: Exception):
+        self.NAME = name
+        self.error = error
+
+    async def evaluate(self, *args):
+        raise self.error
+
+
+def run(strategies):
+    return asyncio.run(HedgedEvaluationStrategy(strategies).evaluate("texto", 100.0, b"", "wav"))
+
+
+def test_all_providers_paused_keeps_unavailable_and_shortest_retry_after():
+    with pytest.raises(ProviderUnavailableError) as info:
+        run([
+            Failing("gemini-flash", ProviderUnavailableError("pausa", retry_after=20)),
+            Failing("openai-audio", ProviderUnavailableError("pausa", retry_after=5)),
+        ])
+    assert info.value.retry_after == 5
+
+
+def test_mixed_provider_errors_raise_provider_error():
+    with pytest.raises(ProviderError) as info:
+        run([
+            Failing("gemini-flash", ProviderUnavailableError("pausa", retry_after=20)),
+            Failing("openai-audio", ProviderError("500", status=500)),
+        ])
+    assert not isinstance(info.value, ProviderUnavailableError)
+
+
+def test_other_failures_stay_generic():
+    with pytest.raises(Exception) as info:
+        run([Failing("gemini-flash", ProviderError("500", status=500)), Failing("openai-audio", ValueError("json"))])
+    assert not isinstance(info.value, ProviderError)
@@ -0,0 +1,72 @@
+import io
+import asyncio
+import pytest
+from services import JobService as job_module
+from services.JobService import COMPLETADO, JobQueueFullError, JobService
+from services.UploadReader import UploadReader
+
+
+class FakeEvaluationService:
+    """Evalúa leyendo el archivo del trabajo; no pasa por el pool DSP ni el modelo."""
+
+    def __init__(self):
+        self.uploads = UploadReader()
+        self.release = asyncio.Event()
+
+    async def evaluate(self, text, audio, model):
+        await self.release.wait()
+        audio.seek(0)
+        return {"bytes": len(audio.read())}
+
+
+@pytest.fixture(autouse=True)
+def no_model_client(monkeypatch):
+    # submit() valida el modelo creando la estrategia; acá no hacen falta claves.
+    monkeypatch.setattr(job_module.EvaluationStrategyFactory, "create", staticmethod(lambda model: None))
+
+
+def test_pending_jobs_are_bounded_by_bytes(monkeypatch):
+    monkeypatch.setenv("JOB_MAX_PENDING_MB", "1")
+    service = JobService(FakeEvaluationService(), workers=1)
+
+    async def scenario():
+        await service.start()
+        first = io.BytesIO(b"x" * 600_000)
+        await service.submit("texto", first, "gemini-flash")
+        second = io.BytesIO(b"x" * 600_000)
+        with pytest.raises(JobQueueFullError):
+            await service.submit("texto", second, "gemini-flash")
+        assert not second.closed  # rechazado: el archivo sigue siendo del llamador
+
+        service.evaluation_service.release.set()
+        while service.pending_bytes:
+            await asyncio.sleep(0.01)
+        assert first.closed
+        await service.stop()
+
+    asyncio.run(scenario())
+
+
+def test_persisted_audio_is_restored_after_a_restart(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    audio = b"RIFF" + bytes(range(256)) * 10_000  # más de un bloque de copia
+
+    async def submit():
+        service = JobService(FakeEvaluationService(), workers=1, db_path=db_path)
+        await service.start()
+        job = await service.submit("texto", io.BytesIO(audio), "gemini-flash")
+        await service.stop()
+        return job["id"]
+
+    async def restart(job_id):
+        evaluation = FakeEvaluationService()
+        evaluation.release.set()
+        service = JobService(evaluation, workers=1, db_path=db_path)
+        await service.start()
+        job = await service.get(job_id, wait=5)
+        await service.stop()
+        return job
+
+    job = asyncio.run(restart(asyncio.run(submit())))
+    assert job["estado"] == COMPLETADO
+    assert job["resultado"] == {"bytes": len(audio)}
@@ -0,0 +1,116 @@
+import time
+import asyncio
+import pytest
+from services.strategies.ProviderGuard import (
+    ABIERTO, CERRADO, SEMIABIERTO, CircuitBreaker, ProviderError, ProviderGuard, ProviderUnavailableError, TokenBucket,
+)
+
+
+def half_open_guard(monkeypatch) -> ProviderGuard:
+    """Guard con el circuito vencido (la próxima llamada es la prueba) y el bucket sin tokens."""
+    monkeypatch.setenv("TEST_RATE_LIMIT", "1")
+    monkeypatch.setenv("TEST_RATE_LIMIT_MAX_WAIT", "0.05")
+    monkeypatch.setenv("TEST_MAX_RETRIES", "0")
+    guard = ProviderGuard("test")
+    guard.breaker.state = ABIERTO
+    guard.breaker.open_until = time.monotonic() - 1
+    guard.bucket.tokens = 0
+    return guard
+
+
+async def ok():
+    return "ok"
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_timeout():
+    breaker = CircuitBreaker(threshold=2, reset_timeout=0.01)
+    breaker.record_failure(ProviderError("x", status=503))
+    assert breaker.state == CERRADO
+    breaker.record_failure(ProviderError("x", status=503))
+    assert breaker.state == ABIERTO
+    with pytest.raises(ProviderUnavailableError):
+        breaker.before_call("test")
+
+    time.sleep(0.02)
+    breaker.before_call("test")
+    assert breaker.state == SEMIABIERTO
+    with pytest.raises(ProviderUnavailableError):
+        breaker.before_call("test")  # una sola prueba a la vez
+    breaker.record_success()
+    assert breaker.state == CERRADO
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = CircuitBreaker(threshold=5, reset_timeout=0.0)
+    breaker.state = ABIERTO
+    breaker.before_call("test")
+    breaker.record_failure(ProviderError("x", status=500))
+    assert breaker.state == ABIERTO
+
+
+def test_rate_limited_probe_releases_the_half_open_slot(monkeypatch):
+    guard = half_open_guard(monkeypatch)
+    with pytest.raises(ProviderUnavailableError):
+        asyncio.run(guard.call(ok, "Test", asyncio.Semaphore(1)))
+    assert guard.breaker.state == SEMIABIERTO
+    assert not guard.breaker._probing
+
+    guard.bucket.tokens = 1
+    assert asyncio.run(guard.call(ok, "Test", asyncio.Semaphore(1))) == "ok"
+    assert guard.breaker.state == CERRADO
+
+
+def test_cancelled_probe_while_waiting_for_a_token_releases_the_slot(monkeypatch):
+    guard = half_open_guard(monkeypatch)
+    guard.bucket.max_wait = 10
+
+    async def scenario():
+        call = asyncio.ensure_future(guard.call(ok, "Test", asyncio.Semaphore(1)))
+        await asyncio.sleep(0.01)
+        assert guard.breaker._probing
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+    asyncio.run(scenario())
+    assert not guard.breaker._probing
+
+
+def test_retry_after_is_honored_and_retried_without_opening_the_breaker(monkeypatch):
+    monkeypatch.setenv("TEST_MAX_RETRIES", "1")
+    guard = ProviderGuard("test")
+    attempts = []
+
+    async def rate_limited_once():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise ProviderError("429", status=429, retry_after=0.2)
+        return "ok"
+
+    assert asyncio.run(guard.call(rate_limited_once, "Test", asyncio.Semaphore(1))) == "ok"
+    assert len(attempts) == 2 and attempts[1] - attempts[0] >= 0.2
+    assert guard.breaker.state == CERRADO
+
+
+def test_retry_after_paces_other_calls_instead_of_shedding_them():
+    guard = ProviderGuard("test")
+    guard.breaker.record_failure(ProviderError("429", status=429, retry_after=0.2))
+    guard.bucket.pause(0.2)
+    assert guard.breaker.state == CERRADO
+
+    start = time.monotonic()
+    assert asyncio.run(guard.call(ok, "Test", asyncio.Semaphore(1))) == "ok"
+    assert time.monotonic() - start >= 0.19
+
+
+def test_token_bucket_sheds_when_the_wait_is_too_long():
+    bucket = TokenBucket(rate=1, capacity=1, max_wait=0.5)
+    asyncio.run(bucket.acquire("Test"))
+    with pytest.raises(ProviderUnavailableError) as info:
+        asyncio.run(bucket.acquire("Test"))
+    assert info.value.status == 429
+
+    bucket.throttle()
+    assert bucket.rate == 0.5
+    bucket.recover()
+    assert bucket.rate == pytest.approx(0.55)
@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from services.SingleFlight import SingleFlight
+
+
+def test_identical_concurrent_calls_share_one_factory_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"resultado": len(calls)}
+
+    async def scenario():
+        return await asyncio.gather(flight.run("k", factory), flight.run("k", factory))
+
+    first, second = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert first == second == {"resultado": 1}
+    assert flight.calls == 1 and flight.coalesced == 1
+    assert flight.stats()["en_vuelo"] == 0
+
+
+def test_errors_are_shared_too():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("proveedor")
+
+    async def scenario():
+        return await asyncio.gather(flight.run("k", failing), flight.run("k", failing), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.calls == 1
+
+
+def test_shared_call_is_cancelled_only_without_waiters():
+    flight = SingleFlight()
+    started = []
+
+    async def slow():
+        started.append(1)
+        await asyncio.sleep(10)
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.run("k", slow))
+        second = asyncio.ensure_future(flight.run("k", slow))
+        await asyncio.sleep(0.01)
+        assert len(started) == 1 and flight.coalesced == 1
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert flight.stats()["en_vuelo"] == 1  # sigue para el segundo
+        second.cancel()
+        await asyncio.sleep(0.01)
+        assert flight.stats()["en_vuelo"] == 0
+        with pytest.raises(asyncio.CancelledError):
+            await second
+
+    asyncio.run(scenario())